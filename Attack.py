@@ -1,6 +1,16 @@
+import argparse
+import multiprocessing
+import os
 import string
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from Tree.Models.DirectoryHasher import DirectoryHasher
 from Tree.Models.Encoder import Encoder
+from Tree.Models.HashFunc import HashFunc
+
+ALPHABET = string.ascii_letters + string.digits
+_stop_event = None
 
 def generate_random_string(length):
     """Generate a random string of given length."""
@@ -8,16 +18,13 @@ def generate_random_string(length):
 
 def check_file_collisions():
     """Check for collisions between the files"""
-    file_names = ["Attack Files/file1.txt", 'Attack Files/file2.txt', 'Attack Files/file3.txt', 
-                  'Attack Files/file4.txt', 'Attack Files/file5.txt']
-    
     # Store hashes for each file
     file_hashes = {}
     
     print("\n=== Checking for collisions between files ===")
-    for file_name in file_names:
-        encoder = Encoder(file_name, isFile=True)
-        current_hash = encoder.getFinalHash()
+    hasher = DirectoryHasher("Attack Files", pattern="file*.txt")
+    for file_name, current_hash, _ in hasher.iterRoots():
+        file_name = f"Attack Files/{file_name}"
         
         # Check if this hash already exists
         if current_hash in file_hashes:
@@ -29,13 +36,76 @@ def check_file_collisions():
         
         file_hashes[current_hash] = file_name
         print(f"Hash for {file_name}: {current_hash}")
+
+    # A file that could not be hashed was not checked, so the result would be incomplete
+    if hasher.errors:
+        for file_name, error in sorted(hasher.errors.items()):
+            print(f"Could not hash Attack Files/{file_name}: {error}")
+        raise RuntimeError(f"{len(hasher.errors)} file(s) could not be hashed")
     
     print("\nNo collisions found between files.")
     return False
 
-def check_random_string_collisions():
+def _init_search_worker(stop_event):
+    """Give a search worker the shared event that stops the campaign."""
+    global _stop_event
+    _stop_event = stop_event
+
+def search_random_strings(target_hash, original_data, length, seed, count, batch_size=1000):
+    """
+    Hash count seeded random strings in batches of root hashes only.
+
+    Returns (colliding string or None, candidates tried). Stops early when
+    another worker has set the stop event.
+    """
+    rng = random.Random(seed)
+    tried = 0
+    while tried < count:
+        if _stop_event is not None and _stop_event.is_set():
+            break
+        candidates = [''.join(rng.choices(ALPHABET, k=length)) for _ in range(min(batch_size, count - tried))]
+        for candidate, candidate_hash in zip(candidates, Encoder.rootHashMany(candidates)):
+            tried += 1
+            if candidate_hash == target_hash and candidate != original_data:
+                if _stop_event is not None:
+                    _stop_event.set()
+                return candidate, tried
+    return None, tried
+
+def parallel_random_string_search(target_hash, original_data, total_candidates, workers=None, seed=0, task_size=50000):
+    """
+    Split total_candidates into seeded tasks of task_size and search them across worker processes.
+
+    Task i always uses seed + i, so a campaign covers the same candidates for any
+    number of workers. Returns (colliding string or None, candidates tried, seconds).
+    """
+    workers = workers or os.cpu_count() or 1
+    stop_event = multiprocessing.Event()
+    start = time.perf_counter()
+    found, tried = None, 0
+    tasks = [(seed + i, min(task_size, total_candidates - offset))
+             for i, offset in enumerate(range(0, total_candidates, task_size))]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker, initargs=(stop_event,)) as executor:
+        futures = [executor.submit(search_random_strings, target_hash, original_data, len(original_data), task_seed, count)
+                   for task_seed, count in tasks]
+        for future in as_completed(futures):
+            # Tasks cancelled after a match are handed back too, without a result
+            if future.cancelled():
+                continue
+            candidate, task_tried = future.result()
+            tried += task_tried
+            if candidate is not None and found is None:
+                found = candidate
+                for pending in futures:
+                    pending.cancel()
+            elapsed = time.perf_counter() - start
+            print(f"Tried {tried} strings... ({tried / elapsed:,.0f} candidates/s)")
+
+    return found, tried, time.perf_counter() - start
+
+def check_random_string_collisions(max_attempts=100000, workers=None, seed=0):
     """Check for collisions using random strings"""
-    max_attempts = 100000
     test_file = "Attack Files/file1.txt"  # Using first file as reference
     
     print("\n=== Checking for collisions with random strings ===")
@@ -46,32 +116,98 @@ def check_random_string_collisions():
     original_hash = encoder.getFinalHash()
     original_data = encoder.getOriginalData()
     
-    # Try random strings
-    for i in range(max_attempts):
-        candidate_data = generate_random_string(len(original_data))
-        encoder = Encoder(candidate_data, isFile=False)
-        candidate_hash = encoder.getFinalHash()
-        
-        if candidate_hash == original_hash and candidate_data != original_data:
-            print(f"\nCOLLISION FOUND after {i+1} attempts!")
-            print(f"Original data hash: {original_hash}")
-            print(f"Colliding string: {candidate_data}")
-            return True
-        
-        if (i + 1) % 1000 == 0:
-            print(f"Tried {i + 1} strings...")
+    candidate, tried, elapsed = parallel_random_string_search(original_hash, original_data, max_attempts, workers, seed)
+    print(f"Searched {tried} strings in {elapsed:.1f}s ({tried / elapsed:,.0f} candidates/s)")
+    
+    if candidate is not None:
+        print(f"\nCOLLISION FOUND after {tried} attempts!")
+        print(f"Original data hash: {original_hash}")
+        print(f"Colliding string: {candidate}")
+        return True
     
     print("\nNo collisions found with random strings.")
     return False
 
+def birthday_input(mode, seed, index):
+    """Return the index-th input of a birthday run, so colliding inputs can be rebuilt from their index."""
+    if mode == "tree":
+        return f"seed{seed} document {index} of the birthday run"
+    return f"{seed}:{index}"
+
+def birthday_collisions(count, bits=(16, 24, 32), mode="hash", position="low", seed=0, batch_size=100000):
+    """
+    Hash count distinct inputs and count pairs whose digests agree on k bits, for every k in bits.
+
+    mode "hash" hashes short strings with HashFunc.custom_hash, mode "tree" takes
+    root hashes of multi-word documents. Only 64 bits of each digest (its last or
+    first 16 hex digits, see position) are kept, in one uint64 array that is sorted
+    per k so equal keys end up next to each other.
+    """
+    import numpy as np
+
+    keys = np.empty(count, dtype=np.uint64)
+    for start in range(0, count, batch_size):
+        inputs = [birthday_input(mode, seed, index) for index in range(start, min(start + batch_size, count))]
+        hashes = Encoder.rootHashMany(inputs) if mode == "tree" else HashFunc.custom_hash_many(inputs)
+        digits = [digest[-16:] if position == "low" else digest[:16] for digest in hashes]
+        keys[start:start + len(inputs)] = [int(value, 16) for value in digits]
+
+    report = []
+    for k in bits:
+        if position == "low":
+            truncated = keys & np.uint64((1 << k) - 1)
+        else:
+            truncated = keys >> np.uint64(64 - k)
+        order = np.argsort(truncated, kind="stable")
+        ordered = truncated[order]
+        _, group_sizes = np.unique(ordered, return_counts=True)
+        pairs = int((group_sizes * (group_sizes - 1) // 2).sum())
+        expected = count * (count - 1) / 2 / 2 ** k
+        equal = np.flatnonzero(ordered[1:] == ordered[:-1])
+        example = None
+        if len(equal):
+            example = (birthday_input(mode, seed, int(order[equal[0]])), birthday_input(mode, seed, int(order[equal[0] + 1])))
+        report.append({"bits": k, "inputs": count, "pairs": pairs, "expected_pairs": expected,
+                       "ratio": pairs / expected if expected else float("nan"),
+                       "birthday_bound": 2 ** (k / 2), "example": example})
+    return report
+
+def check_birthday_collisions(count, bits, mode="hash", position="low", seed=0):
+    """Print how often truncated digests collide compared with an ideal k-bit hash"""
+    print(f"\n=== Birthday search over {count} inputs ({mode} mode, {position} bits) ===")
+    start = time.perf_counter()
+    report = birthday_collisions(count, bits, mode, position, seed)
+    elapsed = time.perf_counter() - start
+    for row in report:
+        print(f"k={row['bits']:>2}  N/2^(k/2)={count / row['birthday_bound']:10.2f}  pairs {row['pairs']:>10}  "
+              f"expected {row['expected_pairs']:14.2f}  observed/expected {row['ratio']:8.2f}")
+        if row["example"]:
+            print(f"      e.g. {row['example'][0]!r} and {row['example'][1]!r}")
+    print(f"Hashed {count} inputs in {elapsed:.1f}s ({count / elapsed:,.0f} inputs/s)")
+    return report
+
 def main():
+    parser = argparse.ArgumentParser(description="Search for collisions of the multi-level hash")
+    parser.add_argument("-n", "--candidates", type=int, default=100000, help="number of random strings to try")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes, defaults to the CPU count")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first candidate generator")
+    parser.add_argument("--birthday", type=int, metavar="N", help="run only the birthday search over N inputs")
+    parser.add_argument("--bits", type=int, nargs="+", default=[16, 24, 32], help="digest bits kept in the birthday search")
+    parser.add_argument("--mode", choices=["hash", "tree"], default="hash", help="hash strings directly or as Encoder roots")
+    parser.add_argument("--position", choices=["low", "high"], default="low", help="keep the last or the first digest bits")
+    args = parser.parse_args()
+    
+    if args.birthday:
+        check_birthday_collisions(args.birthday, args.bits, args.mode, args.position, args.seed)
+        return
+    
     print("Starting collision detection...")
     
     # First check file collisions
     file_collision = check_file_collisions()
     
     # Then check random string collisions
-    random_collision = check_random_string_collisions()
+    random_collision = check_random_string_collisions(args.candidates, args.workers, args.seed)
     
     # Summary
     print("\n=== SUMMARY ===")
@@ -0,0 +1,117 @@
+from collections import deque
+import hashlib
+import io
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+# One 32-bit value per byte, fixed so chunk boundaries never change between runs
+_GEAR = [int.from_bytes(hashlib.sha256(bytes([value])).digest()[:4], 'big') for value in range(256)]
+_GEAR_ARRAY = np.array(_GEAR, dtype=np.uint32) if np is not None else None
+
+class Chunker:
+
+    """
+    Content-defined chunking with a 32-bit gear rolling hash.
+
+    The hash after a byte depends only on the last 32 bytes, so a boundary is
+    a property of the content around it: an insertion only moves the
+    boundaries next to it, and the chunks after them come out unchanged.
+    """
+
+    WINDOW = 32
+
+    def __init__(self, minSize:int=2048, avgSize:int=8192, maxSize:int=65536, blockSize:int=1 << 22)->None:
+
+        """
+        Chunker.Constructor
+
+        Chunks are cut where the top log2(avgSize) bits of the hash are zero,
+        but never shorter than minSize or longer than maxSize. Files are read
+        blockSize bytes at a time.
+        """
+
+        if avgSize & (avgSize - 1) or not self.WINDOW <= minSize < avgSize < maxSize:
+            raise ValueError("need a power of two avgSize and WINDOW <= minSize < avgSize < maxSize")
+        self.minSize = minSize
+        self.avgSize = avgSize
+        self.maxSize = maxSize
+        self.blockSize = blockSize
+        bits = avgSize.bit_length() - 1
+        self.mask = ((1 << bits) - 1) << (32 - bits)
+
+    def candidates(self, block:bytes, context:bytes, state:int)->tuple[list[int], int]:
+
+        """
+        Chunker.candidates
+
+        Returns the indices of block after which the hash matches the mask,
+        and the rolling hash after the last byte. context holds the up to
+        WINDOW - 1 bytes before block and state the hash before it.
+        """
+
+        if np is None:
+            ends = []
+            mask = self.mask
+            for index, value in enumerate(block):
+                state = ((state << 1) + _GEAR[value]) & 0xFFFFFFFF
+                if not state & mask:
+                    ends.append(index)
+            return ends, state
+
+        # The rolling hash equals the sum of gear[byte] << age over the last WINDOW bytes
+        data = np.frombuffer(context + block, dtype=np.uint8)
+        gear = _GEAR_ARRAY[data]
+        hashes = gear.copy()
+        for age in range(1, min(self.WINDOW, len(data))):
+            hashes[age:] += gear[:len(data) - age] << np.uint32(age)
+        hashes = hashes[len(context):]
+        ends = np.flatnonzero((hashes & np.uint32(self.mask)) == 0).tolist()
+        return ends, int(hashes[-1]) if len(hashes) else state
+
+    def chunks(self, source):
+
+        """
+        Chunker.chunks
+
+        Yields the chunks of a bytes-like object or binary file in order. Only
+        about one block is held in memory at a time.
+        """
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        buffer = bytearray()
+        start = 0               # stream offset of buffer[0]
+        ends: deque = deque()   # stream offsets right after a matching hash
+        context = b""
+        state = 0
+        while True:
+            block = source.read(self.blockSize)
+            if block:
+                offset = start + len(buffer)
+                found, state = self.candidates(block, context, state)
+                ends.extend(offset + index + 1 for index in found)
+                context = (context + block)[-(self.WINDOW - 1):]
+                buffer += block
+
+            end = start + len(buffer)
+            cut = start
+            while cut < end:
+                while ends and ends[0] - cut < self.minSize:
+                    ends.popleft()
+                if ends and ends[0] - cut <= self.maxSize:
+                    nextCut = ends.popleft()
+                elif end - cut >= self.maxSize:
+                    nextCut = cut + self.maxSize
+                elif not block:
+                    nextCut = end
+                else:
+                    break
+                yield bytes(buffer[cut - start:nextCut - start])
+                cut = nextCut
+            del buffer[:cut - start]
+            start = cut
+            if not block:
+                return
@@ -0,0 +1,430 @@
+from array import array
+import heapq
+import mmap
+import struct
+import sys
+
+# magic, version, node count, leaf count, word pool size
+_HEADER = struct.Struct('<8sIQQQ')
+_MAGIC = b'MLHTREE\0'
+_VERSION = 1
+# Version of files whose digests are raw bytes rather than hex hashes
+_VERSION_RAW = 2
+
+class _HeapEntry:
+
+    """
+    Heap item ordered by frequency only, so ties break exactly like Node
+    """
+
+    __slots__ = ('freq', 'index')
+
+    def __init__(self, frequency:int, index:int)->None:
+        self.freq = frequency
+        self.index = index
+
+    def __lt__(self, entry2)->bool:
+        return self.freq < entry2.freq
+
+
+class CompactTree:
+
+    """
+    Array-backed Merkle tree with the same shape and hashes as the Node tree.
+
+    Node i is the leaf of the i-th word for i < leafCount and a temp node
+    otherwise; the root is the last node. Digests are kept as 32-byte slots
+    plus their hex digit count, words in one UTF-8 pool with offsets.
+    With rawDigests the hashes are custom_hash_bytes digests, handed out by
+    getDigest, and getHash is their hex form.
+    """
+
+    __slots__ = ('freq', 'left', 'right', 'parent', 'digests', 'digits', 'wordPool', 'wordOffsets', 'leafCount',
+                 'leafIndex', 'wordOrder', 'source', 'rawDigests')
+
+    DIGEST_SIZE = 32
+
+    def __init__(self)->None:
+
+        """
+        CompactTree.Constructor
+        """
+
+        self.freq = array('q')
+        self.left = array('i')
+        self.right = array('i')
+        self.parent = array('i')
+        self.digests = bytearray()
+        self.digits = array('B')
+        self.wordPool = bytearray()
+        self.wordOffsets = array('Q', [0])
+        self.leafCount = 0
+        self.leafIndex = None
+        self.wordOrder = None
+        self.source = None
+        self.rawDigests = False
+
+    @classmethod
+    def build(cls, freqDict:dict, hashLeaves, hashMany, rawDigests:bool=False)->"CompactTree":
+
+        """
+        CompactTree.build
+
+        Builds the tree Encoder.makeNodes and Encoder.makeTree would build,
+        hashing the leaves with hashLeaves and each height of temp nodes
+        with one hashMany call. With rawDigests both return bytes digests.
+        """
+
+        tree = cls()
+        tree.rawDigests = rawDigests
+        words = list(freqDict.keys())
+        for word in words:
+            tree.wordPool += word.encode('utf-8')
+            tree.wordOffsets.append(len(tree.wordPool))
+            tree.addNode(freqDict[word], -1, -1)
+        tree.leafCount = len(words)
+        tree.setHashes(range(len(words)), hashLeaves(words))
+
+        heap: list[_HeapEntry] = []
+        for index in range(len(words)):
+            heapq.heappush(heap, _HeapEntry(tree.freq[index], index))
+
+        heights = array('i', bytes(4 * len(words)))
+        levels: list[list[int]] = []
+        while len(heap) > 1:
+            entryL = heapq.heappop(heap)
+            entryR = heapq.heappop(heap)
+            index = tree.addNode(entryL.freq + entryR.freq, entryL.index, entryR.index)
+            height = max(heights[entryL.index], heights[entryR.index]) + 1
+            heights.append(height)
+            if height > len(levels):
+                levels.append([])
+            levels[height - 1].append(index)
+            heapq.heappush(heap, _HeapEntry(tree.freq[index], index))
+
+        digest = tree.getDigest if rawDigests else tree.getHash
+        for level in levels:
+            hashes = hashMany([digest(tree.left[i]) + digest(tree.right[i]) for i in level])
+            tree.setHashes(level, hashes)
+        return tree
+
+    @classmethod
+    def fromNodes(cls, leaves:list, root, rawDigests:bool=False)->"CompactTree":
+
+        """
+        CompactTree.fromNodes
+
+        Copies a Node tree. leaves must be the leaf Nodes in fileDict order.
+        """
+
+        tree = cls()
+        tree.rawDigests = rawDigests
+        indices = {}
+        for leaf in leaves:
+            tree.wordPool += leaf.word.encode('utf-8')
+            tree.wordOffsets.append(len(tree.wordPool))
+            indices[id(leaf)] = tree.addNode(leaf.freq, -1, -1)
+            tree.setHashes([indices[id(leaf)]], [leaf.hashValue])
+        tree.leafCount = len(leaves)
+
+        # Post-order, so both children have an index before their parent
+        stack = [(root, False)]
+        while stack:
+            node, childrenDone = stack.pop()
+            if id(node) in indices:
+                continue
+            if childrenDone:
+                index = tree.addNode(node.freq, indices[id(node.leftChild)], indices[id(node.rightChild)])
+                tree.setHashes([index], [node.hashValue])
+                indices[id(node)] = index
+                continue
+            stack.append((node, True))
+            stack.append((node.rightChild, False))
+            stack.append((node.leftChild, False))
+        return tree
+
+    @property
+    def root(self)->int:
+        return len(self.freq) - 1
+
+    def __len__(self)->int:
+        return len(self.freq)
+
+    def addNode(self, frequency:int, left:int, right:int)->int:
+
+        """
+        CompactTree.addNode
+        """
+
+        index = len(self.freq)
+        self.freq.append(frequency)
+        self.left.append(left)
+        self.right.append(right)
+        self.parent.append(-1)
+        if left >= 0:
+            self.parent[left] = index
+        if right >= 0:
+            self.parent[right] = index
+        self.digests += bytes(self.DIGEST_SIZE)
+        self.digits.append(0)
+        return index
+
+    def getDepth(self)->int:
+
+        """
+        CompactTree.getDepth
+
+        Children always come before their parent, so one pass in index order
+        finds the height of the root.
+        """
+
+        heights = array('i', bytes(4 * len(self.freq)))
+        for index in range(self.leafCount, len(self.freq)):
+            heights[index] = max(heights[self.left[index]], heights[self.right[index]]) + 1
+        return heights[self.root] if len(self.freq) else 0
+
+    def isLeaf(self, index:int)->bool:
+        return self.left[index] < 0 and self.right[index] < 0
+
+    def getHash(self, index:int)->str:
+
+        """
+        CompactTree.getHash
+        """
+
+        start = index * self.DIGEST_SIZE
+        value = int.from_bytes(self.digests[start:start + self.DIGEST_SIZE], 'big')
+        return '{0:0{1}x}'.format(value, self.digits[index])
+
+    def getDigest(self, index:int)->bytes:
+
+        """
+        CompactTree.getDigest
+
+        Returns a raw digest stored by setHashes.
+        """
+
+        end = (index + 1) * self.DIGEST_SIZE
+        return bytes(self.digests[end - self.digits[index] // 2:end])
+
+    def setHashes(self, indices, hashes:list[str])->None:
+
+        """
+        CompactTree.setHashes
+        """
+
+        for index, hashValue in zip(indices, hashes):
+            start = index * self.DIGEST_SIZE
+            if isinstance(hashValue, bytes):
+                if len(hashValue) > self.DIGEST_SIZE:
+                    raise ValueError(f"digest of {len(hashValue)} bytes does not fit a digest slot")
+                self.digests[start:start + self.DIGEST_SIZE] = hashValue.rjust(self.DIGEST_SIZE, b'\0')
+                self.digits[index] = 2 * len(hashValue)
+                continue
+            if len(hashValue) > 2 * self.DIGEST_SIZE:
+                raise ValueError(f"hash of {len(hashValue)} hex digits does not fit a digest slot")
+            self.digests[start:start + self.DIGEST_SIZE] = int(hashValue, 16).to_bytes(self.DIGEST_SIZE, 'big')
+            self.digits[index] = len(hashValue)
+
+    def hashInputs(self):
+
+        """
+        CompactTree.hashInputs
+
+        Yields (hash input, hash) for every node: the word of a leaf, the
+        concatenated child hashes of a temp node. Raw digests stay bytes.
+        """
+
+        digest = self.getDigest if self.rawDigests else self.getHash
+        for index in range(len(self.freq)):
+            if index < self.leafCount:
+                yield self.getWord(index), digest(index)
+            else:
+                yield digest(self.left[index]) + digest(self.right[index]), digest(index)
+
+    def getWord(self, index:int)->str:
+
+        """
+        CompactTree.getWord
+        """
+
+        if index >= self.leafCount:
+            return "Temp Node"
+        return str(self.getWordBytes(index), 'utf-8')
+
+    def getWordBytes(self, index:int)->bytes:
+        return bytes(self.wordPool[self.wordOffsets[index]:self.wordOffsets[index + 1]])
+
+    def freqDict(self)->dict:
+
+        """
+        CompactTree.freqDict
+
+        Rebuilds the word frequencies in their original order.
+        """
+
+        return {self.getWord(index): self.freq[index] for index in range(self.leafCount)}
+
+    def nodeString(self, index:int)->str:
+        return f"({self.getWord(index)}, {self.freq[index]}, {self.getHash(index)})"
+
+    def printTree(self, index:int|None=None)->None:
+
+        """
+        CompactTree.printTree
+
+        In-order print, like Encoder.printTree, without recursion.
+        """
+
+        stack = []
+        current = self.root if index is None else index
+        while stack or current >= 0:
+            while current >= 0:
+                stack.append(current)
+                current = self.left[current]
+            current = stack.pop()
+            print(self.nodeString(current))
+            current = self.right[current]
+
+    def getLeaf(self, word:str)->int:
+
+        """
+        CompactTree.getLeaf
+
+        Returns the leaf index of word, or -1. A loaded tree binary searches
+        its sorted word order, otherwise a word index is built on first use.
+        """
+
+        if self.wordOrder is not None:
+            target = word.encode('utf-8')
+            low, high = 0, self.leafCount
+            while low < high:
+                middle = (low + high) // 2
+                if self.getWordBytes(self.wordOrder[middle]) < target:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < self.leafCount and self.getWordBytes(self.wordOrder[low]) == target:
+                return self.wordOrder[low]
+            return -1
+        if self.leafIndex is None:
+            self.leafIndex = {self.getWord(index): index for index in range(self.leafCount)}
+        return self.leafIndex.get(word, -1)
+
+    def get_proof_path(self, index:int, target_word:str):
+
+        """
+        Generate a proof path for a specific word, like Encoder.get_proof_path.
+        """
+
+        current = self.getLeaf(target_word)
+        if current < 0:
+            return None
+        path = []
+        while current != index:
+            parent = self.parent[current]
+            if parent < 0:
+                return None
+            if self.left[parent] == current:
+                path.append(("R", self.getHash(self.right[parent])))
+            else:
+                path.append(("L", self.getHash(self.left[parent])))
+            current = parent
+        return path
+
+    def getAllProofs(self):
+
+        """
+        CompactTree.getAllProofs
+
+        Yields (word, proof path) for every leaf in one depth-first pass. The
+        sibling entries above a node are shared on one stack while its
+        subtree is walked.
+        """
+
+        siblings: list = []
+        stack = [(self.root, 0, None)]
+        while stack:
+            node, depth, entry = stack.pop()
+            del siblings[max(depth - 1, 0):]
+            if entry is not None:
+                siblings.append(entry)
+            if self.isLeaf(node):
+                yield self.getWord(node), siblings[::-1]
+                continue
+            left, right = self.left[node], self.right[node]
+            stack.append((right, depth + 1, ("L", self.getHash(left))))
+            stack.append((left, depth + 1, ("R", self.getHash(right))))
+
+    def _sections(self, wordOrder)->list:
+        return [('freq', 'q', self.freq), ('left', 'i', self.left), ('right', 'i', self.right),
+                ('parent', 'i', self.parent), ('digits', 'B', self.digits), ('digests', 'B', self.digests),
+                ('wordOffsets', 'Q', self.wordOffsets), ('wordOrder', 'i', wordOrder), ('wordPool', 'B', self.wordPool)]
+
+    def save(self, path:str)->None:
+
+        """
+        CompactTree.save
+
+        Writes a header followed by every array, little-endian and 8-byte
+        aligned, plus the leaves sorted by word for lookups without an index.
+        """
+
+        wordOrder = array('i', sorted(range(self.leafCount), key=self.getWordBytes))
+        with open(path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION_RAW if self.rawDigests else _VERSION, len(self.freq),
+                                    self.leafCount, len(self.wordPool)))
+            for _, typecode, values in self._sections(wordOrder):
+                file.write(bytes(-file.tell() % 8))
+                values = array(typecode, values)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                file.write(values.tobytes())
+
+    @classmethod
+    def load(cls, path:str, useMmap:bool=True)->"CompactTree":
+
+        """
+        CompactTree.load
+
+        With useMmap the arrays are typed views into a read-only memory map,
+        so only the pages a lookup touches are read from disk. A file that is
+        not a saved tree, or is shorter than its header says, raises ValueError.
+        """
+
+        with open(path, 'rb') as file:
+            if useMmap:
+                source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                source = file.read()
+        if len(source) < _HEADER.size:
+            raise ValueError(f"{path} is not a saved tree")
+        magic, version, nodeCount, leafCount, poolSize = _HEADER.unpack_from(source, 0)
+        if magic != _MAGIC or version not in (_VERSION, _VERSION_RAW) or leafCount > nodeCount:
+            raise ValueError(f"{path} is not a saved tree")
+
+        tree = cls()
+        tree.rawDigests = version == _VERSION_RAW
+        tree.leafCount = leafCount
+        tree.source = source
+        lengths = {'digests': nodeCount * cls.DIGEST_SIZE, 'wordOffsets': leafCount + 1, 'wordOrder': leafCount,
+                   'wordPool': poolSize}
+        layout = []
+        offset = _HEADER.size + (-_HEADER.size % 8)
+        for name, typecode, _ in tree._sections(None):
+            size = lengths.get(name, nodeCount) * array(typecode).itemsize
+            layout.append((name, typecode, offset, size))
+            offset += size + (-size % 8)
+        if layout[-1][2] + layout[-1][3] > len(source):
+            raise ValueError(f"{path} is truncated, not a saved tree")
+
+        view = memoryview(source)
+        for name, typecode, offset, size in layout:
+            section = view[offset:offset + size]
+            if sys.byteorder != 'little' and typecode != 'B':
+                values = array(typecode, bytes(section))
+                values.byteswap()
+            else:
+                values = section.cast(typecode)
+            setattr(tree, name, values)
+        return tree
@@ -0,0 +1,170 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import json
+import os
+import time
+
+from .Encoder import Encoder
+from .HashFunc import HashFunc
+
+def _hashFile(path:str, leafMode:str="words")->str:
+    return Encoder(path, isFile=True, stream=True, leafMode=leafMode).getFinalHash()
+
+class DirectoryHasher:
+
+    """
+    Root hash of every file under a directory, one Encoder per file across a
+    process pool, combined into one forest root over the sorted paths
+    """
+
+    def __init__(self, directory:str, pattern:str="**/*", workers:int|None=None, manifest:str|None=None,
+                 leafMode:str="words")->None:
+
+        """
+        DirectoryHasher.Constructor
+
+        Files matching pattern (relative to directory) are hashed. With a
+        manifest file, files whose size, modification time and leafMode match
+        the manifest keep their recorded root instead of being hashed again, and
+        the manifest is rewritten after every run. leafMode is passed to
+        every Encoder; "chunks" also hashes binary files.
+        """
+
+        self.directory = directory
+        self.pattern = pattern
+        self.leafMode = leafMode
+        self.workers = workers or os.cpu_count() or 1
+        self.manifestPath = manifest
+        self.manifest: dict = {}
+        if manifest is not None and os.path.exists(manifest):
+            with open(manifest, 'r', encoding='utf-8') as file:
+                self.manifest = json.load(file)
+        self.roots: dict = {}
+        self.errors: dict = {}
+        self.filesHashed = 0
+        self.filesSkipped = 0
+        self.bytesHashed = 0
+        self.elapsed = 0.0
+
+    def files(self)->list[str]:
+
+        """
+        DirectoryHasher.files
+
+        Returns the matching files as sorted relative POSIX paths.
+        """
+
+        base = Path(self.directory)
+        return sorted(path.relative_to(base).as_posix() for path in base.glob(self.pattern) if path.is_file())
+
+    def iterRoots(self):
+
+        """
+        DirectoryHasher.iterRoots
+
+        Yields (path, root, skipped) for every file: unchanged files first,
+        then the others as their workers finish. Files that fail to hash are
+        left out and recorded in self.errors.
+        """
+
+        start = time.perf_counter()
+        self.roots, self.errors = {}, {}
+        self.filesHashed = self.filesSkipped = self.bytesHashed = 0
+        manifest = {}
+        pending = {}
+        for path in self.files():
+            info = os.stat(os.path.join(self.directory, path))
+            signature = [info.st_size, info.st_mtime_ns, self.leafMode]
+            entry = self.manifest.get(path)
+            if entry is not None and entry[:3] == signature:
+                manifest[path] = entry
+                self.roots[path] = entry[3]
+                self.filesSkipped += 1
+                yield path, entry[3], True
+            else:
+                pending[path] = signature
+
+        try:
+            for path, root, error in self._hashPending(pending):
+                if error is not None:
+                    self.errors[path] = error
+                    continue
+                manifest[path] = pending[path] + [root]
+                self.roots[path] = root
+                self.filesHashed += 1
+                self.bytesHashed += pending[path][0]
+                yield path, root, False
+        finally:
+            self.manifest = manifest
+            self.elapsed = time.perf_counter() - start
+            if self.manifestPath is not None:
+                with open(self.manifestPath, 'w', encoding='utf-8') as file:
+                    json.dump(manifest, file)
+
+    def _hashPending(self, pending:dict):
+        if self.workers <= 1 or len(pending) <= 1:
+            for path in pending:
+                try:
+                    yield path, _hashFile(os.path.join(self.directory, path), self.leafMode), None
+                except Exception as error:
+                    yield path, None, repr(error)
+            return
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as executor:
+            futures = {executor.submit(_hashFile, os.path.join(self.directory, path), self.leafMode): path
+                       for path in pending}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as error:
+                    yield futures[future], None, repr(error)
+
+    def run(self, skipErrors:bool=False)->str:
+
+        """
+        DirectoryHasher.run
+
+        Hashes the directory and returns its forest root. If a file fails to
+        hash a RuntimeError is raised, since the root would not cover it;
+        with skipErrors the root covers the other files and the failures are
+        left in self.errors.
+        """
+
+        for _ in self.iterRoots():
+            pass
+        if self.errors and not skipErrors:
+            failed = ", ".join(sorted(self.errors))
+            raise RuntimeError(f"{len(self.errors)} file(s) could not be hashed: {failed}")
+        return self.forestRoot(self.roots)
+
+    @staticmethod
+    def forestRoot(roots:dict)->str:
+
+        """
+        DirectoryHasher.forestRoot
+
+        Binary Merkle root over the (path, root) pairs sorted by path, so it
+        depends only on the files and not on the order they finished in. An
+        odd node at the end of a level moves up unchanged.
+        """
+
+        if not roots:
+            raise ValueError("no file roots to combine")
+        level = HashFunc.custom_hash_many([f"{path}\0{roots[path]}" for path in sorted(roots)])
+        while len(level) > 1:
+            hashes = HashFunc.custom_hash_many([level[i] + level[i + 1] for i in range(0, len(level) - 1, 2)])
+            if len(level) % 2:
+                hashes.append(level[-1])
+            level = hashes
+        return level[0]
+
+    def throughput(self)->tuple[float, float]:
+
+        """
+        DirectoryHasher.throughput
+
+        Returns (files per second, MB per second) of the files hashed by the last run.
+        """
+
+        if self.elapsed <= 0:
+            return 0.0, 0.0
+        return self.filesHashed / self.elapsed, self.bytesHashed / 1e6 / self.elapsed
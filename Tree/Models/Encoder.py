@@ -1,7 +1,17 @@
 from .Node import Node
+from .Chunker import Chunker
+from .CompactTree import CompactTree, _HeapEntry
+from .EncoderStats import EncoderStats
 
 from .HashFunc import HashFunc
+from .LeafCache import LeafCache
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import hashlib
 import heapq
+import io
+import os
 import string
 
 class Encoder:
@@ -10,55 +20,481 @@ class Encoder:
     Encoder Class that creates a tree and hashes each node
     """
     
-    def __init__(self, fileOrString:str, isFile:bool)->None:
+    # Batches smaller than this are hashed in-process even when workers > 1
+    parallelThreshold = 50000
+    # Characters read per chunk when a file is streamed
+    streamChunkSize = 1 << 20
+    # Inputs hashed between two progress reports
+    progressChunkSize = 20000
+    # Chunks hashed per batch while a chunked input is read
+    chunkBatchSize = 1024
+    
+    def __init__(self, fileOrString:str, isFile:bool, leafCache:LeafCache|bool|None=None, workers:int=1,
+                 stream:bool=False, compact:bool=False, progress=None, leafMode:str="words",
+                 chunker:Chunker|None=None, rawDigests:bool=False)->None:
         
         """
         Encoder.Constructor
+        
+        Pass leafCache=True to reuse leaf hashes through the process-wide
+        LeafCache, or a LeafCache instance to use that one instead.
+        With workers > 1 large hash batches are sharded across a process pool.
+        With stream=True a file is counted chunk by chunk and its content is
+        not kept, so getOriginalData returns None.
+        Stage timings and hashing counters are collected in self.stats.
+        With compact=True the tree is built into a CompactTree (self.tree)
+        instead of Node objects, and nodeList is None.
+        progress(stage, done, total) is called as the file is streamed and as
+        nodes are hashed; an exception raised by it aborts the build.
+        With leafMode="chunks" the input is read as bytes and cut into
+        content-defined chunks by chunker; the leaves are the chunks in input
+        order, paired level by level, and fileDict counts the distinct chunk
+        hashes.
+        With rawDigests=True the nodes hold custom_hash_bytes digests and
+        temp nodes hash their children's concatenated bytes instead of hex
+        text. The root differs from the default hex tree; getFinalHash and
+        the proofs give it and the sibling hashes as hex.
         """
         
-        if isFile:    
+        if leafMode not in ("words", "chunks"):
+            raise ValueError(f"unknown leafMode '{leafMode}', expected 'words' or 'chunks'")
+        if leafMode == "chunks" and compact:
+            raise ValueError("compact trees only support word leaves")
+        if leafCache is True:
+            leafCache = LeafCache.shared()
+        self.leafCache = leafCache if isinstance(leafCache, LeafCache) else None
+        self.workers = workers
+        self.executor = None
+        self.building = False
+        self.compact = compact
+        self.hashMemo = None
+        self.progress = progress
+        self.nodesHashed = 0
+        self.leafMode = leafMode
+        self.chunker = chunker or Chunker()
+        self.rawDigests = rawDigests
+        self.stats = EncoderStats()
+        if leafMode == "chunks":
+            if isFile:
+                self.file_path = fileOrString
+            else:
+                self.sentence = fileOrString
+            self.fileContent = None
+            self.fileDict = None
+            with self.stats.stage("readChunks"):
+                self.chunkHashes, self.chunkSizes = self.readChunks(fileOrString, isFile)
+            self.fileDict = dict(Counter(self.chunkHashes))
+        elif isFile and stream:
             self.file_path = fileOrString
-            self.fileContent = self.readFile(fileOrString)
+            self.fileContent = None
+            with self.stats.stage("streamFreq"):
+                self.fileDict = self.streamFreq(fileOrString)
         else:
-            self.sentence = fileOrString
-            self.fileContent = self.readString(self.sentence)
-        self.fileDict = self.parseFreq(self.fileContent)
-        self.nodeList = self.makeNodes()
-        self.makeTree()
+            if isFile:    
+                self.file_path = fileOrString
+                with self.stats.stage("readFile"):
+                    self.fileContent = self.readFile(fileOrString)
+            else:
+                self.sentence = fileOrString
+                with self.stats.stage("readString"):
+                    self.fileContent = self.readString(self.sentence)
+            with self.stats.stage("parseFreq"):
+                self.fileDict = self.parseFreq(self.fileContent)
+        self.buildTree()
         # self.printTree(self.nodeList[0])
         
+    def buildTree(self)->None:
+        
+        """
+        Encoder.buildTree
+        
+        Builds the tree for fileDict, as a CompactTree or from Node objects.
+        """
+        
+        self.tree = None
+        self.nodeList = None
+        # Chunk leaves were hashed while the input was read
+        self.nodesHashed = len(self.chunkHashes) if self.leafMode == "chunks" else 0
+        self.building = True
+        try:
+            if self.leafMode == "chunks":
+                with self.stats.stage("makeChunkTree"):
+                    self.makeChunkTree()
+                self.stats.peakNodeCount = 2 * len(self.chunkHashes) - 1
+            elif self.compact:
+                with self.stats.stage("CompactTree.build"):
+                    self.tree = CompactTree.build(self.fileDict, self.hashLeaves, self.hashMany, self.rawDigests)
+                self.stats.treeDepth = self.tree.getDepth()
+                self.stats.peakNodeCount = len(self.tree)
+            else:
+                with self.stats.stage("makeNodes"):
+                    self.nodeList = self.makeNodes()
+                with self.stats.stage("makeTree"):
+                    self.makeTree()
+                self.stats.peakNodeCount = 2 * len(self.fileDict) - 1
+        finally:
+            self.building = False
+            self.shutdownExecutor()
+        self.stats.vocabularySize = len(self.fileDict)
+        
     def getFinalHash(self)->str:
         
         """
         Encoder.getFinalHash
         """
         
-        return self.nodeList[0].hashValue
+        if self.tree is not None:
+            return self.tree.getHash(self.tree.root)
+        return self.exportHash(self.nodeList[0].hashValue)
 
+    def getRoot(self)->Node|int:
+        
+        """
+        Encoder.getRoot
+        
+        Returns the root Node, or the root index of a compact tree.
+        """
+        
+        if self.tree is not None:
+            return self.tree.root
+        return self.nodeList[0]
 
-    def hash(self, input_data:str, rounds=10)->str:
+
+    @classmethod
+    def rootHash(cls, sentence:str, rounds=10, rawDigests:bool=False)->str:
+        
+        """
+        Encoder.rootHash
+        """
+        
+        return cls.rootHashMany([sentence], rounds, rawDigests)[0]
+
+    @classmethod
+    def rootHashMany(cls, sentences:list[str], rounds=10, rawDigests:bool=False)->list[str]:
+        
+        """
+        Encoder.rootHashMany
+        
+        Returns getFinalHash() of Encoder(sentence, isFile=False, rawDigests=rawDigests) for every
+        sentence without building Node trees. Only the tree shapes are built;
+        the leaves of all sentences are hashed in one batch, then each height
+        of temp nodes across all sentences in one batch.
+        """
+        
+        parser = cls.__new__(cls)
+        hashes: list = []
+        children: dict = {}
+        leafIds: list[int] = []
+        leafWords: list[str] = []
+        levels: list[list[int]] = []
+        roots = []
+        for sentence in sentences:
+            freqDict = parser.parseFreq(parser.readString(sentence))
+            heap: list[_HeapEntry] = []
+            heights: dict = {}
+            for word, frequency in freqDict.items():
+                leafIds.append(len(hashes))
+                leafWords.append(word)
+                heapq.heappush(heap, _HeapEntry(frequency, len(hashes)))
+                hashes.append(None)
+            while len(heap) > 1:
+                entryL = heapq.heappop(heap)
+                entryR = heapq.heappop(heap)
+                nodeId = len(hashes)
+                hashes.append(None)
+                children[nodeId] = (entryL.index, entryR.index)
+                height = max(heights.get(entryL.index, 0), heights.get(entryR.index, 0)) + 1
+                heights[nodeId] = height
+                if height > len(levels):
+                    levels.append([])
+                levels[height - 1].append(nodeId)
+                heapq.heappush(heap, _HeapEntry(entryL.freq + entryR.freq, nodeId))
+            roots.append(heap[0].index)
+        
+        hashFunction = HashFunc.custom_hash_many_bytes if rawDigests else HashFunc.custom_hash_many
+        for nodeId, hashValue in zip(leafIds, hashFunction(leafWords, rounds)):
+            hashes[nodeId] = hashValue
+        for level in levels:
+            inputs = [hashes[children[nodeId][0]] + hashes[children[nodeId][1]] for nodeId in level]
+            for nodeId, hashValue in zip(level, hashFunction(inputs, rounds)):
+                hashes[nodeId] = hashValue
+        return [hashes[root].hex() if rawDigests else hashes[root] for root in roots]
+
+    @property
+    def hashCalls(self)->int:
+        return self.stats.hashCalls
+
+    def exportHash(self, hashValue:str|bytes)->str:
+        
+        """
+        Encoder.exportHash
+        
+        Returns a node hash as hex, the form given out by getFinalHash and the proofs.
+        """
+        
+        return hashValue.hex() if self.rawDigests else hashValue
+
+    def importHash(self, hashValue:str)->str|bytes:
+        
+        """
+        Encoder.importHash
+        
+        Turns a hash given out by exportHash back into the form the nodes hold.
+        """
+        
+        return bytes.fromhex(hashValue) if self.rawDigests else hashValue
+
+    @staticmethod
+    def digestFromHex(hashValue:str)->bytes:
+        
+        """
+        Encoder.digestFromHex
+        
+        Returns the raw digest of a hex hash, equal to HashFunc.custom_hash_bytes of the same input.
+        """
+        
+        return int(hashValue, 16).to_bytes((len(hashValue) + 1) // 2, 'big')
+
+    def hash(self, input_data:str, rounds=10)->str|bytes:
         
         """
         Encoder.hash
+        
+        bytes are hashed like a chunk leaf. With rawDigests the digest is
+        returned as bytes.
         """
         
+        if self.rawDigests:
+            return HashFunc.custom_hash_many_bytes([input_data], rounds)[0]
+        if isinstance(input_data, (bytes, bytearray, memoryview)):
+            return HashFunc.custom_hash_many([input_data], rounds)[0]
         return HashFunc.custom_hash(input_data, rounds)
 
+    def hashMany(self, inputs:list[str], rounds=10)->list[str]:
+        
+        """
+        Encoder.hashMany
+        
+        While hashMemo is set, inputs already in it are not hashed again.
+        """
+        
+        if self.hashMemo is None:
+            return self.computeHashes(inputs, rounds)
+        missing = [data for data in dict.fromkeys(inputs) if data not in self.hashMemo]
+        self.hashMemo.update(zip(missing, self.computeHashes(missing, rounds)))
+        return [self.hashMemo[data] for data in inputs]
+
+    def reportProgress(self, stage:str, done:int, total:int)->None:
+        
+        """
+        Encoder.reportProgress
+        """
+        
+        if self.progress is not None:
+            self.progress(stage, done, total)
+
+    def computeHashes(self, inputs:list[str], rounds=10, raw:bool|None=None)->list[str]:
+        
+        """
+        Encoder.computeHashes
+        
+        With a progress callback the inputs are hashed progressChunkSize at a
+        time, reporting the nodes hashed out of the 2n-1 of the tree.
+        raw picks bytes digests or hex hashes, rawDigests by default.
+        """
+        
+        if self.progress is not None and len(inputs) > self.progressChunkSize:
+            hashes = []
+            for start in range(0, len(inputs), self.progressChunkSize):
+                hashes.extend(self.computeHashes(inputs[start:start + self.progressChunkSize], rounds, raw))
+            return hashes
+        hashes = self.computeHashChunk(inputs, rounds, self.rawDigests if raw is None else raw)
+        self.nodesHashed += len(inputs)
+        if self.progress is not None and self.fileDict is not None:
+            leafCount = len(self.chunkHashes) if self.leafMode == "chunks" else len(self.fileDict)
+            self.progress("hash", self.nodesHashed, max(2 * leafCount - 1, 1))
+        return hashes
+
+    def computeHashChunk(self, inputs:list[str], rounds=10, raw:bool=False)->list[str]:
+        
+        """
+        Encoder.computeHashChunk
+        
+        The process pool is kept for every batch of a build and shut down
+        when it ends; a large batch outside a build gets a pool of its own.
+        """
+        
+        self.stats.hashCalls += len(inputs)
+        self.stats.bytesHashed += sum(len(data) if isinstance(data, bytes) else len(data.encode('utf-8'))
+                                      for data in inputs)
+        hashFunction = HashFunc.custom_hash_many_bytes if raw else HashFunc.custom_hash_many
+        if self.workers <= 1 or len(inputs) < self.parallelThreshold:
+            return hashFunction(inputs, rounds)
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        shardSize = -(-len(inputs) // (self.workers * 4))
+        shards = [inputs[i:i+shardSize] for i in range(0, len(inputs), shardSize)]
+        hashes = []
+        try:
+            for batch in self.executor.map(hashFunction, shards, repeat(rounds)):
+                hashes.extend(batch)
+        finally:
+            if not self.building:
+                self.shutdownExecutor()
+        return hashes
+
+    def shutdownExecutor(self)->None:
+        
+        """
+        Encoder.shutdownExecutor
+        
+        Stops the worker processes of the process pool, if one is running.
+        """
+        
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def hashLeaves(self, words:list[str])->list[str]:
+        
+        """
+        Encoder.hashLeaves
+        
+        The LeafCache keeps hex hashes, so raw digests are converted from them
+        and one cache serves both modes.
+        """
+        
+        if self.leafCache is None:
+            return self.hashMany(words)
+        if self.rawDigests:
+            hexHashes = self.leafCache.hashMany(words, lambda missing, rounds: self.computeHashes(missing, rounds, raw=False))
+            return [self.digestFromHex(h) for h in hexHashes]
+        return self.leafCache.hashMany(words, self.hashMany)
+
     def makeTree(self):
         
         """
         Encoder.makeTree
+        
+        The heap only orders by frequency, so the shape is built first and the
+        temp nodes are hashed afterwards, one batch per height above the leaves.
         """
-                
+        
+        heights: dict = {}
+        levels: list[list[Node]] = []
         while len(self.nodeList) > 1:
             nodeL = heapq.heappop(self.nodeList)
             nodeR = heapq.heappop(self.nodeList)
             tempNode = Node(nodeL.freq+nodeR.freq, f"Temp Node")
             tempNode.leftChild = nodeL
             tempNode.rightChild = nodeR
-            tempNode.setWordHash(self.hash, newWord=f"{nodeL.hashValue}{nodeR.hashValue}")
+            nodeL.parent = tempNode
+            nodeR.parent = tempNode
+            height = max(heights.get(id(nodeL), 0), heights.get(id(nodeR), 0)) + 1
+            heights[id(tempNode)] = height
+            if height > len(levels):
+                levels.append([])
+            levels[height - 1].append(tempNode)
             heapq.heappush(self.nodeList, tempNode)
         
+        self.stats.treeDepth = len(levels)
+        for level in levels:
+            hashes = self.hashMany([node.leftChild.hashValue + node.rightChild.hashValue for node in level])
+            for node, hashValue in zip(level, hashes):
+                node.hashValue = hashValue
+        
+
+    def readChunks(self, fileOrString:str, isFile:bool)->tuple[list[str], list[int]]:
+        
+        """
+        Encoder.readChunks
+        
+        Cuts the input into chunks and hashes them chunkBatchSize at a time,
+        so a file is never held in memory. Returns the chunk hashes and sizes
+        in input order; empty input is one empty chunk.
+        """
+        
+        hashes: list[str] = []
+        sizes: list[int] = []
+        batch: list[bytes] = []
+        if isFile:
+            total = os.path.getsize(fileOrString)
+            source = open(fileOrString, 'rb')
+        else:
+            data = fileOrString.encode('utf-8')
+            total = len(data)
+            source = io.BytesIO(data)
+        with source:
+            for chunk in self.chunker.chunks(source):
+                batch.append(chunk)
+                sizes.append(len(chunk))
+                if len(batch) >= self.chunkBatchSize:
+                    hashes.extend(self.hashChunks(batch))
+                    batch = []
+                    self.reportProgress("readChunks", sum(sizes), total)
+        if not sizes:
+            batch, sizes = [b""], [0]
+        hashes.extend(self.hashChunks(batch))
+        self.reportProgress("readChunks", total, total)
+        return hashes, sizes
+    
+    def hashChunks(self, chunks:list[bytes])->list[str]:
+        
+        """
+        Encoder.hashChunks
+        
+        With a LeafCache, chunks are looked up by their BLAKE2b digest, so a
+        chunk seen before is not hashed again and its bytes are not kept.
+        """
+        
+        if self.leafCache is None:
+            return self.hashMany(chunks)
+        keys = ["chunk:" + hashlib.blake2b(chunk).hexdigest() for chunk in chunks]
+        byKey = dict(zip(keys, chunks))
+        hashes = self.leafCache.hashMany(keys, lambda missing, rounds: self.computeHashes([byKey[key] for key in missing],
+                                                                                          rounds, raw=False))
+        return [self.digestFromHex(h) for h in hashes] if self.rawDigests else hashes
+    
+    def makeChunkTree(self)->None:
+        
+        """
+        Encoder.makeChunkTree
+        
+        Leaves are the chunks in input order, with their size as frequency.
+        Each level pairs neighbouring nodes and an odd node at the end moves
+        up unchanged, so an edit only changes the hashes on the paths above
+        the chunks it touched and to their right.
+        """
+        
+        level: list[Node] = []
+        self.leaves = {}
+        offset = 0
+        for hashValue, size in zip(self.chunkHashes, self.chunkSizes):
+            leaf = Node(size, f"Chunk {offset}:{offset + size}")
+            leaf.hashValue = hashValue
+            self.leaves.setdefault(hashValue, leaf)
+            level.append(leaf)
+            offset += size
+        
+        depth = 0
+        while len(level) > 1:
+            parents = []
+            for nodeL, nodeR in zip(level[0::2], level[1::2]):
+                tempNode = Node(nodeL.freq + nodeR.freq, "Temp Node")
+                tempNode.leftChild = nodeL
+                tempNode.rightChild = nodeR
+                nodeL.parent = tempNode
+                nodeR.parent = tempNode
+                parents.append(tempNode)
+            hashes = self.hashMany([node.leftChild.hashValue + node.rightChild.hashValue for node in parents])
+            for node, hashValue in zip(parents, hashes):
+                node.hashValue = hashValue
+            if len(level) % 2:
+                parents.append(level[-1])
+            level = parents
+            depth += 1
+        self.nodeList = level
+        self.stats.treeDepth = depth
 
     def makeNodes(self)->list[Node]:
         
@@ -67,9 +503,12 @@ class Encoder:
         """        
         
         nodeList = []
-        for word in self.fileDict.keys():
+        self.leaves = {}
+        words = list(self.fileDict.keys())
+        for word, hashValue in zip(words, self.hashLeaves(words)):
             tempNode = Node(self.fileDict[word], word)
-            tempNode.setWordHash(self.hash)
+            tempNode.hashValue = hashValue
+            self.leaves[word] = tempNode
             heapq.heappush(nodeList, tempNode)
         return nodeList
         
@@ -91,7 +530,7 @@ class Encoder:
         """
         
         translator = str.maketrans('', '', string.punctuation)
-        with open(filePath, 'r') as file:
+        with open(filePath, 'r', encoding='utf-8') as file:
             return (file.read()).translate(translator)
             
 
@@ -110,6 +549,33 @@ class Encoder:
                 freqDict[word] = 1
             
         return freqDict
+    
+
+    def streamFreq(self, filePath:str)->Counter:
+        
+        """
+        Encoder.streamFreq
+        
+        Same result as parseFreq(readFile(filePath)) without holding the file
+        in memory. The text after the last space of a chunk may be the start
+        of a word, so it is carried over to the next chunk. Like readFile it
+        decodes the file as UTF-8 whatever the locale.
+        """
+        
+        translator = str.maketrans('', '', string.punctuation)
+        freqDict: Counter = Counter()
+        carry = ""
+        size = os.path.getsize(filePath)
+        read = 0
+        with open(filePath, 'r', encoding='utf-8') as file:
+            while chunk := file.read(self.streamChunkSize):
+                words = (carry + chunk.translate(translator)).split(" ")
+                carry = words.pop()
+                freqDict.update(words)
+                read += len(chunk)
+                self.reportProgress("streamFreq", min(read, size), size)
+        freqDict[carry] += 1
+        return freqDict
         
 
     def printNodes(self)->None:
@@ -118,16 +584,22 @@ class Encoder:
         Encoder.printNodes
         """
         
+        if self.tree is not None:
+            print(self.tree.nodeString(self.tree.root))
+            return
         for i in range(len(self.nodeList)):
             print(self.nodeList[i])
 
 
-    def printTree(self, node:Node)->None:
+    def printTree(self, node:Node|int)->None:
         
         """
         Encoder.printTree
         """
         
+        if self.tree is not None:
+            self.tree.printTree(node)
+            return
         if node.leftChild == None and node.rightChild == None:
             print(node)
             return
@@ -154,30 +626,61 @@ class Encoder:
         
         return self.fileContent
     
-    def get_proof_path(self, node: Node, target_word: str, path=None):
+    def get_proof_path(self, node: Node, target_word: str):
         """
         Generate a proof path for a specific word in the Merkle tree.
+        
+        Walks the parent links from the word's leaf up to node, so it costs
+        O(depth). Each entry is (side of the sibling, sibling hash), leaf first,
+        as verify_chunk_with_path expects. Returns None if the word's leaf is
+        not under node. With chunk leaves, pass the chunk bytes or their hash.
         """
-        if path is None:
-            path = []
+        if self.tree is not None:
+            return self.tree.get_proof_path(node, target_word)
+        if isinstance(target_word, (bytes, bytearray, memoryview)):
+            # Chunk leaves are found by their hash
+            target_word = self.hash(target_word)
+        elif self.leafMode == "chunks":
+            target_word = self.importHash(target_word)
 
-        # Base case: Leaf node with the target word
-        if not node.leftChild and not node.rightChild and node.word == target_word:
-            return path
-
-        # Traverse left child
-        if node.leftChild:
-            left_path = self.get_proof_path(node.leftChild, target_word, path + [("L", node.leftChild.hashValue)])
-            if left_path:
-                return left_path
+        current = self.leaves.get(target_word)
+        if current is None:
+            return None
+        path = []
+        while current is not node:
+            parent = current.parent
+            if parent is None:
+                return None
+            if parent.leftChild is current:
+                path.append(("R", self.exportHash(parent.rightChild.hashValue)))
+            else:
+                path.append(("L", self.exportHash(parent.leftChild.hashValue)))
+            current = parent
+        return path
 
-        # Traverse right child
-        if node.rightChild:
-            right_path = self.get_proof_path(node.rightChild, target_word, path + [("R", node.rightChild.hashValue)])
-            if right_path:
-                return right_path
+    def getAllProofs(self):
+        """
+        Yield (word, proof path) for every leaf in one iterative depth-first pass.
+        
+        The sibling entries above the current node live on one shared stack, so
+        each proof is only copied out once when its leaf is reached.
+        """
+        if self.tree is not None:
+            yield from self.tree.getAllProofs()
+            return
 
-        return None
+        siblings: list = []
+        stack = [(self.nodeList[0], 0, None)]
+        while stack:
+            node, depth, entry = stack.pop()
+            del siblings[max(depth - 1, 0):]
+            if entry is not None:
+                siblings.append(entry)
+            if node.leftChild is None and node.rightChild is None:
+                yield node.word, siblings[::-1]
+                continue
+            stack.append((node.rightChild, depth + 1, ("L", self.exportHash(node.leftChild.hashValue))))
+            stack.append((node.leftChild, depth + 1, ("R", self.exportHash(node.rightChild.hashValue))))
 
     def verify_chunk_with_path(self, data_chunk: str, proof_path, root_hash):
         """
@@ -185,9 +688,189 @@ class Encoder:
         """
         current_hash = self.hash(data_chunk)
         for direction, sibling_hash in proof_path:
+            try:
+                sibling_hash = self.importHash(sibling_hash)
+            except ValueError:
+                return False
             if direction == "L":
                 current_hash = self.hash(sibling_hash + current_hash)
             elif direction == "R":
                 current_hash = self.hash(current_hash + sibling_hash)
 
-        return current_hash == root_hash
+        return self.exportHash(current_hash) == root_hash
+
+    def get_multiproof(self, target_words: list[str]):
+        """
+        Generate one proof for several words that holds each needed sibling hash once.
+        
+        Nodes are addressed by their path from the root, '0' for a left and '1'
+        for a right child. "leaves" maps each word to its leaf position and
+        "siblings" holds the hashes of the nodes next to those paths that the
+        verifier cannot compute itself. Returns None if a word is missing.
+        """
+        leaves = {}
+        proofs = []
+        for word in target_words:
+            proof = self.get_proof_path(self.getRoot(), word)
+            if proof is None:
+                return None
+            position = "".join("0" if direction == "R" else "1" for direction, _ in reversed(proof))
+            leaves[word] = position
+            proofs.append((position, proof))
+
+        covered = {position[:depth] for position in leaves.values() for depth in range(len(position) + 1)}
+        siblings = {}
+        for position, proof in proofs:
+            for i, (_, sibling_hash) in enumerate(proof):
+                node = position[:len(position) - i]
+                sibling = node[:-1] + ("1" if node[-1] == "0" else "0")
+                if sibling not in covered:
+                    siblings[sibling] = sibling_hash
+        return {"leaves": leaves, "siblings": siblings}
+
+    def verify_multiproof(self, data_chunks: list[str], multiproof, root_hash):
+        """
+        Verify several data chunks against the root hash with one multiproof.
+        
+        data_chunks must be the words the multiproof was generated for.
+        Every internal hash shared by the chunks' paths is computed once, and
+        each depth of the tree is hashed in one batch. Proofs that put two
+        words at one position, or a word above another, are rejected.
+        """
+        leaves = multiproof["leaves"]
+        data_chunks = list(dict.fromkeys(data_chunks))
+        if any(chunk not in leaves for chunk in data_chunks):
+            return False
+        positions = [leaves[chunk] for chunk in data_chunks]
+        if len(set(positions)) != len(positions) or any(position.strip("01") for position in positions):
+            return False
+        covered = {position[:depth] for position in positions for depth in range(len(position) + 1)}
+        if any(position + "0" in covered or position + "1" in covered for position in positions) \
+                or covered & multiproof["siblings"].keys():
+            return False
+
+        try:
+            known = {position: self.importHash(sibling) for position, sibling in multiproof["siblings"].items()}
+        except ValueError:
+            return False
+        known.update(zip(positions, self.hashMany(list(data_chunks))))
+        for depth in range(max(map(len, positions), default=0), 0, -1):
+            parents = sorted({position[:depth - 1] for position in covered if len(position) == depth})
+            if any(parent + "0" not in known or parent + "1" not in known for parent in parents):
+                return False
+            hashes = self.hashMany([known[parent + "0"] + known[parent + "1"] for parent in parents])
+            known.update(zip(parents, hashes))
+
+        return bool(positions) and "" in known and self.exportHash(known[""]) == root_hash
+
+    def getHashMemo(self)->dict:
+        """
+        Map every hash input in the current tree to its hash: the word of each
+        leaf and the concatenated child hashes of each temp node.
+        """
+        if self.tree is not None:
+            return dict(self.tree.hashInputs())
+        memo = {}
+        stack = [self.nodeList[0]]
+        while stack:
+            node = stack.pop()
+            if node.leftChild is None and node.rightChild is None:
+                memo[node.word] = node.hashValue
+                continue
+            memo[node.leftChild.hashValue + node.rightChild.hashValue] = node.hashValue
+            stack.append(node.leftChild)
+            stack.append(node.rightChild)
+        return memo
+
+    def apply_diff(self, freq_delta: dict) -> int:
+        """
+        Change word counts by freq_delta and update the tree to match.
+        
+        Words whose count drops to zero are removed and new words are appended,
+        so the tree equals a full rebuild from the updated fileDict. The shape is
+        rebuilt without hashing, and only leaves and temp nodes whose hash input
+        did not appear in the old tree are hashed. The stored text no longer
+        matches afterwards, so getOriginalData returns None.
+
+        Only the hashing is incremental. A changed count can move a word
+        anywhere in the frequency heap and reshape the tree above it, so the
+        heap and nodes are rebuilt in full and the memo of old hash inputs
+        holds about 2n entries: a one-word edit still takes O(n log n) time
+        and O(n) extra memory.
+
+        Returns the number of hash computations the update needed.
+        """
+        if self.leafMode == "chunks":
+            raise ValueError("apply_diff only supports word leaves")
+        if self.fileDict is None:
+            self.fileDict = self.tree.freqDict()
+        newDict = dict(self.fileDict)
+        for word, delta in freq_delta.items():
+            count = newDict.get(word, 0) + delta
+            if count < 0:
+                raise ValueError(f"cannot remove {-delta} of '{word}', only {newDict.get(word, 0)} present")
+            if count == 0:
+                newDict.pop(word, None)
+            else:
+                newDict[word] = count
+        if not newDict:
+            raise ValueError("the tree needs at least one word")
+
+        callsBefore = self.hashCalls
+        self.hashMemo = self.getHashMemo()
+        try:
+            self.fileDict = newDict
+            self.buildTree()
+        finally:
+            self.hashMemo = None
+        self.fileContent = None
+        return self.hashCalls - callsBefore
+
+    def add_word(self, word: str, count=1) -> int:
+        """
+        Add count occurrences of word, see apply_diff.
+        """
+        return self.apply_diff({word: count})
+
+    def remove_word(self, word: str, count=1) -> int:
+        """
+        Remove count occurrences of word, see apply_diff.
+        """
+        return self.apply_diff({word: -count})
+
+    def save(self, path: str) -> None:
+        """
+        Save the tree in the binary CompactTree format, see Encoder.load.
+        """
+        if self.leafMode == "chunks":
+            raise ValueError("save only supports word leaves")
+        if self.tree is not None:
+            self.tree.save(path)
+        else:
+            CompactTree.fromNodes(list(self.leaves.values()), self.nodeList[0], self.rawDigests).save(path)
+
+    @classmethod
+    def load(cls, path: str, mmap=True) -> "Encoder":
+        """
+        Open a tree written by Encoder.save without rebuilding it.
+        
+        The Encoder is in compact mode with the tree memory-mapped (or read in
+        full with mmap=False). fileDict is only rebuilt when an update needs it.
+        """
+        encoder = cls.__new__(cls)
+        encoder.leafCache = None
+        encoder.workers = 1
+        encoder.executor = None
+        encoder.building = False
+        encoder.compact = True
+        encoder.hashMemo = None
+        encoder.progress = None
+        encoder.nodesHashed = 0
+        encoder.leafMode = "words"
+        encoder.stats = EncoderStats()
+        encoder.fileContent = None
+        encoder.fileDict = None
+        encoder.nodeList = None
+        encoder.tree = CompactTree.load(path, mmap)
+        encoder.rawDigests = encoder.tree.rawDigests
+        return encoder
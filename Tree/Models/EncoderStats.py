@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+import time
+
+class EncoderStats:
+
+    """
+    Wall time per build stage and hashing counters of one Encoder
+    """
+
+    def __init__(self)->None:
+
+        """
+        EncoderStats.Constructor
+        """
+
+        self.stageTimes: dict = {}
+        self.hashCalls = 0
+        self.bytesHashed = 0
+        self.vocabularySize = 0
+        self.treeDepth = 0
+        self.peakNodeCount = 0
+
+    @contextmanager
+    def stage(self, name:str):
+
+        """
+        EncoderStats.stage
+
+        Adds the wall time of the with-block to the named stage.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stageTimes[name] = self.stageTimes.get(name, 0.0) + time.perf_counter() - start
+
+    def toDict(self)->dict:
+
+        """
+        EncoderStats.toDict
+        """
+
+        return {
+            "stageTimes": dict(self.stageTimes),
+            "totalTime": sum(self.stageTimes.values()),
+            "hashCalls": self.hashCalls,
+            "bytesHashed": self.bytesHashed,
+            "vocabularySize": self.vocabularySize,
+            "treeDepth": self.treeDepth,
+            "peakNodeCount": self.peakNodeCount,
+        }
+
+    def __str__(self)->str:
+        lines = [f"{name:<12}{seconds * 1000:10.2f} ms" for name, seconds in self.stageTimes.items()]
+        lines.append(f"{'total':<12}{sum(self.stageTimes.values()) * 1000:10.2f} ms")
+        lines.append(f"hash calls {self.hashCalls}, bytes hashed {self.bytesHashed}")
+        lines.append(f"vocabulary {self.vocabularySize}, tree depth {self.treeDepth}, nodes {self.peakNodeCount}")
+        return "\n".join(lines)
@@ -1,5 +1,155 @@
 import os
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_SALT = b"581756ef16edad700121d3e0e7c4dac3"
+
+# _SPREAD[b] holds the eight bits of b (most significant first) as eight 0x00/0x01 bytes.
+_SPREAD = [int.from_bytes(bytes((b >> (7 - k)) & 1 for k in range(8)), 'big') for b in range(256)]
+_ROUND_CONSTANTS: dict = {}
+
+
+def _xor_fold(value: int, words: int, word_bits: int) -> int:
+    """
+    XORs together the `words` word_bits-wide words packed big-endian in value.
+    """
+    acc = 0
+    word_mask = (1 << word_bits) - 1
+    while words > 1:
+        if words & 1:
+            acc ^= value & word_mask
+            value >>= word_bits
+            words -= 1
+        shift = (words >> 1) * word_bits
+        value = (value >> shift) ^ (value & ((1 << shift) - 1))
+        words >>= 1
+    return acc ^ value
+
+
+def _round_constant(total_bits: int) -> int:
+    """
+    Returns the part of a round output that only depends on the length of the binary text.
+
+    Every character of the binary text is 0x30 or 0x31, so each output byte is 0x30 when an odd
+    number of characters land on it, and the 0xcc padding of a short last chunk is XORed in on top.
+    """
+    constant = _ROUND_CONSTANTS.get(total_bits)
+    if constant is None:
+        full_chunks, remainder = divmod(total_bits, 16)
+        constant = 0
+        for j in range(16):
+            byte = 0x30 if (full_chunks + (j < remainder)) & 1 else 0
+            if remainder and j >= remainder:
+                byte ^= 0xcc
+            constant = (constant << 8) | byte
+        _ROUND_CONSTANTS[total_bits] = constant
+    return constant
+
+
+# Below this many inputs custom_hash_many hashes one by one, the NumPy setup costs more than it saves.
+_MIN_LANES = 96
+_LANE_TABLES: dict = {}
+
+
+def _lane_tables():
+    """
+    Returns the spread and round constant tables as uint64 arrays for the NumPy lanes.
+    """
+    if not _LANE_TABLES:
+        constants = [_round_constant(total_bits) for total_bits in range(257)]
+        _LANE_TABLES["spread"] = np.array(_SPREAD, dtype=np.uint64)
+        _LANE_TABLES["constant_hi"] = np.array([c >> 64 for c in constants], dtype=np.uint64)
+        _LANE_TABLES["constant_lo"] = np.array([c & 0xffffffffffffffff for c in constants], dtype=np.uint64)
+    return _LANE_TABLES
+
+
+def _fold16(hi, lo):
+    """
+    XORs together the eight 16-bit words of each 128-bit lane.
+    """
+    folded = hi ^ lo
+    folded ^= folded >> 32
+    folded ^= folded >> 16
+    return folded & 0xffff
+
+
+def _rotl16(value, shift):
+    """
+    Rotates each 16-bit lane left by its shift, which lies in 0..15.
+    """
+    return ((value << shift) | (value >> (16 - shift))) & 0xffff
+
+
+def _bit_length64(value):
+    """
+    Returns the bit length of each uint64 lane.
+    """
+    length = np.zeros(value.shape, dtype=np.uint64)
+    for step in (32, 16, 8, 4, 2, 1):
+        shifted = value >> step
+        nonzero = shifted != 0
+        length += nonzero * np.uint64(step)
+        value = np.where(nonzero, shifted, value)
+    return length + (value != 0)
+
+
+def _bit_length128(hi, lo):
+    """
+    Returns the bit length of each 128-bit lane.
+    """
+    return np.where(hi != 0, _bit_length64(hi) + np.uint64(64), _bit_length64(lo))
+
+
+def _hash_lanes(data: list, rounds: int) -> list[tuple[int, int]]:
+    """
+    Runs hash_int over every input at once with one NumPy lane per input.
+
+    Both halves of the state fit in 128 bits, so each is kept as a pair of uint64 arrays next to
+    the width of its binary text. The round function only needs the 16-bit parity of that text,
+    which is the XOR of the folded halves rotated by their offsets.
+    """
+    tables = _lane_tables()
+    salted = [item + _SALT for item in data]
+    groups: dict = {}
+    for index, item in enumerate(salted):
+        groups.setdefault((len(item) + 15) // 16, []).append(index)
+
+    state = np.empty((len(salted), 2), dtype=np.uint64)
+    for blocks, indices in groups.items():
+        joined = b''.join(salted[i].ljust(blocks * 16, b'\xcc') for i in indices)
+        words = np.frombuffer(joined, dtype='>u8').reshape(len(indices), blocks, 2)
+        state[indices] = np.bitwise_xor.reduce(words, axis=1)
+
+    zeros = np.zeros(len(salted), dtype=np.uint64)
+    left_hi, left_lo = zeros, state[:, 0].copy()
+    right_hi, right_lo = zeros, state[:, 1].copy()
+    left_bits = np.full(len(salted), 64, dtype=np.uint64)
+    right_bits = left_bits.copy()
+
+    for _ in range(rounds):
+        total_bits = left_bits + right_bits
+        padding = (16 - (total_bits & 15)) & 15
+        parity = _rotl16(_fold16(right_hi, right_lo), (left_bits + padding) & 15)
+        parity ^= _rotl16(_fold16(left_hi, left_lo), padding)
+        round_hi = tables["spread"][parity >> 8] ^ tables["constant_hi"][total_bits]
+        round_lo = tables["spread"][parity & 0xff] ^ tables["constant_lo"][total_bits]
+        left_hi, left_lo, right_hi, right_lo = (
+            left_hi ^ right_hi, left_lo ^ right_lo, round_hi ^ left_hi, round_lo ^ left_lo
+        )
+        left_bits = np.maximum(left_bits, _bit_length128(left_hi, left_lo))
+        right_bits = np.maximum(right_bits, _bit_length128(right_hi, right_lo))
+
+    hashes = []
+    for lh, ll, rh, rl, lb, rb in zip(left_hi.tolist(), left_lo.tolist(), right_hi.tolist(),
+                                      right_lo.tolist(), left_bits.tolist(), right_bits.tolist()):
+        output_hash = ((((lh << 64) | ll)) << rb) | (rh << 64) | rl
+        hashes.append((output_hash, max((lb + rb) // 4, (output_hash.bit_length() + 3) // 4)))
+    return hashes
+
+
 class HashFunc:
     def __init__(self):
         pass
@@ -65,25 +215,223 @@ class HashFunc:
         Returns:
             str: The hashed value of the input data.
         """
-        salt = "581756ef16edad700121d3e0e7c4dac3"
+        output_hash, digits = HashFunc.hash_int(input_data.encode('utf-8'), rounds)
+        return '{0:0{1}x}'.format(output_hash, digits)
+
+    @staticmethod
+    def create_hex_int(data: bytes) -> int:
+        """
+        Integer version of create_hex working directly on bytes.
         
-        compressed_input = HashFunc.create_hex(input_data + salt)
-        half_length = len(compressed_input) // 2
-        left_part = compressed_input[:half_length]
-        right_part = compressed_input[half_length:]
+        Parameters:
+            data (bytes): The non-empty input data to transform.
+            
+        Returns:
+            int: The 128-bit value create_hex would return as hex.
+        """
+        remainder = len(data) % 16
+        padded = data + b'\xcc' * (16 - remainder) if remainder else data
+        blocks = len(padded) // 16
+        value = int.from_bytes(padded, 'big')
+        if blocks == 1:
+            return value ^ int.from_bytes(data, 'big')
+        return _xor_fold(value, blocks, 128)
+
+    @staticmethod
+    def round_function_int(right: int, right_bits: int, left: int, left_bits: int) -> int:
+        """
+        Integer version of round_function over the binary texts of right and left.
+        
+        Parameters:
+            right (int): The right half of the state.
+            right_bits (int): The width of the right half's binary text.
+            left (int): The left half of the state.
+            left_bits (int): The width of the left half's binary text.
+            
+        Returns:
+            int: The 128-bit value round_function would return as hex.
+        """
+        total_bits = right_bits + left_bits
+        remainder = total_bits % 16
+        value = (right << left_bits) | left
+        if remainder:
+            value <<= 16 - remainder
+        parity = _xor_fold(value, -(-total_bits // 16), 16)
+        spread = (_SPREAD[parity >> 8] << 64) | _SPREAD[parity & 0xff]
+        return spread ^ _round_constant(total_bits)
+
+    @staticmethod
+    def hash_int(data: bytes, rounds=10) -> tuple[int, int]:
+        """
+        Runs custom_hash on integers instead of binary and hex strings.
         
-        left_binary = ''.join(format(int(char, 16), '04b') for char in left_part)
-        right_binary = ''.join(format(int(char, 16), '04b') for char in right_part)
+        Parameters:
+            data (bytes): The UTF-8 encoded data to be hashed.
+            rounds (int): The number of hashing rounds.
+            
+        Returns:
+            tuple[int, int]: The hash value and the number of hex digits custom_hash prints it with.
+        """
+        return HashFunc.feistel_int(HashFunc.create_hex_int(data + _SALT), rounds)
+
+    @staticmethod
+    def feistel_int(compressed_input: int, rounds=10) -> tuple[int, int]:
+        """
+        Runs the hashing rounds of custom_hash on an already compressed input.
         
+        Parameters:
+            compressed_input (int): The 128-bit create_hex value of the salted input.
+            rounds (int): The number of hashing rounds.
+            
+        Returns:
+            tuple[int, int]: The hash value and the number of hex digits custom_hash prints it with.
+        """
+        left, right = compressed_input >> 64, compressed_input & 0xffffffffffffffff
+        left_bits = right_bits = 64
+
         for _ in range(rounds):
-            original_right = right_binary
+            round_output = HashFunc.round_function_int(right, right_bits, left, left_bits)
+            left, right = left ^ right, round_output ^ left
+            left_bits = max(left_bits, left.bit_length())
+            right_bits = max(right_bits, right.bit_length())
 
-            round_output = HashFunc.round_function(right_binary, left_binary)
+        output_hash = (left << right_bits) | right
+        digits = max((left_bits + right_bits) // 4, (output_hash.bit_length() + 3) // 4)
+        return output_hash, digits
 
-            right_binary = '{0:0{1}b}'.format(int(round_output, 16) ^ int(left_binary, 2), len(right_binary))
+    @staticmethod
+    def custom_hash_bytes(data: bytes, rounds=10) -> bytes:
+        """
+        Generates the custom hash value for raw bytes.
+        
+        Parameters:
+            data (bytes): The UTF-8 encoded data to be hashed.
+            rounds (int): The number of hashing rounds.
+            
+        Returns:
+            bytes: The hash value of custom_hash as big-endian bytes. Hashes with an odd number of hex
+            digits get one leading zero nibble.
+        """
+        output_hash, digits = HashFunc.hash_int(data, rounds)
+        return output_hash.to_bytes((digits + 1) // 2, 'big')
+
+    @staticmethod
+    def custom_hash_many(inputs: list, rounds=10) -> list[str]:
+        """
+        Generates custom hash values for many inputs in one call.
+        
+        Parameters:
+            inputs (list): The str or bytes inputs to be hashed.
+            rounds (int): The number of hashing rounds.
+            
+        Returns:
+            list[str]: The hash value of each input, equal to calling custom_hash on it.
+        """
+        return ['{0:0{1}x}'.format(*value) for value in HashFunc.hash_int_many(inputs, rounds)]
+
+    @staticmethod
+    def custom_hash_many_bytes(inputs: list, rounds=10) -> list[bytes]:
+        """
+        Generates raw custom hash values for many inputs in one call, without going through hex.
+        
+        Parameters:
+            inputs (list): The str or bytes inputs to be hashed.
+            rounds (int): The number of hashing rounds.
+            
+        Returns:
+            list[bytes]: The hash value of each input, equal to calling custom_hash_bytes on it.
+        """
+        return [value.to_bytes((digits + 1) // 2, 'big') for value, digits in HashFunc.hash_int_many(inputs, rounds)]
+
+    @staticmethod
+    def hash_int_many(inputs: list, rounds=10) -> list[tuple[int, int]]:
+        """
+        Runs hash_int over many inputs, batched in NumPy lanes when there are enough of them.
+        
+        Parameters:
+            inputs (list): The str or bytes inputs to be hashed. Strings are UTF-8 encoded.
+            rounds (int): The number of hashing rounds.
             
-            left_binary = '{0:0{1}b}'.format(int(left_binary, 2) ^ int(original_right, 2), len(left_binary))
+        Returns:
+            list[tuple[int, int]]: The hash value and hex digit count of each input.
+        """
+        data = [item.encode('utf-8') if isinstance(item, str) else bytes(item) for item in inputs]
+        if np is None or len(data) < _MIN_LANES:
+            return [HashFunc.hash_int(item, rounds) for item in data]
+        return _hash_lanes(data, rounds)
+
+    @staticmethod
+    def new(rounds=10) -> "IncrementalHash":
+        """
+        Creates a hashlib-style object that hashes its input as it arrives.
+        
+        Parameters:
+            rounds (int): The number of hashing rounds.
+            
+        Returns:
+            IncrementalHash: An empty hasher, feed it with update().
+        """
+        return IncrementalHash(rounds)
+
+
+class IncrementalHash:
+    """
+    Streaming form of HashFunc.custom_hash.
 
-        output_hash = left_binary + right_binary
+    Full 16-byte blocks are XOR-folded as soon as they arrive, so only the fold and
+    fewer than 16 pending bytes are kept between update() calls.
+    """
 
-        return '{0:0{1}x}'.format(int(output_hash, 2), len(output_hash) // 4)
+    def __init__(self, rounds=10):
+        self.rounds = rounds
+        self._folded = 0
+        self._blocks = 0
+        self._pending = b''
+
+    def update(self, data) -> None:
+        """
+        Feeds more input to the hash.
+        
+        Parameters:
+            data (str | bytes): The next piece of input. Strings are UTF-8 encoded.
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if self._pending:
+            data = self._pending + data
+        view = memoryview(data)
+        usable = len(view) - len(view) % 16
+        if usable:
+            blocks = usable // 16
+            self._folded ^= _xor_fold(int.from_bytes(view[:usable], 'big'), blocks, 128)
+            self._blocks += blocks
+        self._pending = bytes(view[usable:])
+
+    def copy(self) -> "IncrementalHash":
+        """
+        Returns an independent copy of the current state.
+        """
+        other = IncrementalHash(self.rounds)
+        other._folded, other._blocks, other._pending = self._folded, self._blocks, self._pending
+        return other
+
+    def _finish(self) -> tuple[int, int]:
+        final = self.copy()
+        final.update(_SALT)
+        folded = final._folded
+        if final._pending:
+            folded ^= int.from_bytes(final._pending.ljust(16, b'\xcc'), 'big')
+        return HashFunc.feistel_int(folded, self.rounds)
+
+    def digest(self) -> bytes:
+        """
+        Returns the hash of everything fed so far, as custom_hash_bytes would.
+        """
+        output_hash, digits = self._finish()
+        return output_hash.to_bytes((digits + 1) // 2, 'big')
+
+    def hexdigest(self) -> str:
+        """
+        Returns the hash of everything fed so far, as custom_hash would.
+        """
+        return '{0:0{1}x}'.format(*self._finish())
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+import json
+
+from .HashFunc import HashFunc
+
+class LeafCache:
+
+    """
+    Bounded LRU cache of leaf hashes keyed by word and round count, shared across Encoders
+    """
+
+    _shared = None
+
+    def __init__(self, maxSize:int=100000)->None:
+
+        """
+        LeafCache.Constructor
+        """
+
+        if maxSize < 1:
+            raise ValueError("maxSize must be at least 1")
+        self.maxSize = maxSize
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def shared(cls)->"LeafCache":
+
+        """
+        LeafCache.shared
+
+        Returns the process-wide cache, creating it on first use.
+        """
+
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __len__(self)->int:
+        return len(self.entries)
+
+    def get(self, word:str, rounds=10)->str|None:
+
+        """
+        LeafCache.get
+        """
+
+        key = (word, rounds)
+        hashValue = self.entries.get(key)
+        if hashValue is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return hashValue
+
+    def put(self, word:str, hashValue:str, rounds=10)->None:
+
+        """
+        LeafCache.put
+        """
+
+        key = (word, rounds)
+        self.entries[key] = hashValue
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+
+    def hashMany(self, words:list[str], hashFunction=None, rounds=10)->list[str]:
+
+        """
+        LeafCache.hashMany
+
+        Returns the leaf hash of every word, hashing only the cache misses in one
+        batch with hashFunction (HashFunc.custom_hash_many by default).
+        """
+
+        if hashFunction is None:
+            hashFunction = HashFunc.custom_hash_many
+
+        hashes = [self.get(word, rounds) for word in words]
+        missing = [i for i, hashValue in enumerate(hashes) if hashValue is None]
+        if missing:
+            fresh = hashFunction([words[i] for i in missing], rounds)
+            for i, hashValue in zip(missing, fresh):
+                hashes[i] = hashValue
+                self.put(words[i], hashValue, rounds)
+        return hashes
+
+    def clear(self)->None:
+
+        """
+        LeafCache.clear
+        """
+
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, path:str)->None:
+
+        """
+        LeafCache.save
+
+        Writes the entries to a JSON file, least recently used first.
+        """
+
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump([[word, rounds, hashValue] for (word, rounds), hashValue in self.entries.items()], file)
+
+    def load(self, path:str)->None:
+
+        """
+        LeafCache.load
+
+        Adds the entries of a file written by save, keeping the size bound.
+        """
+
+        with open(path, 'r', encoding='utf-8') as file:
+            for word, rounds, hashValue in json.load(file):
+                self.put(word, hashValue, rounds)
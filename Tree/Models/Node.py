@@ -4,6 +4,7 @@ class Node:
         self.word = word
         self.leftChild = None
         self.rightChild = None
+        self.parent = None
         self.hashValue = ""
 
     def setWordHash(self, hashFunction, newWord = '')->None:
@@ -15,9 +16,10 @@ class Node:
         self.leftChild = leftChild
         
     def __str__(self) -> tuple[str]:
-        return f"({self.word}, {self.freq}, {self.hashValue})"
+        hashValue = self.hashValue.hex() if isinstance(self.hashValue, bytes) else self.hashValue
+        return f"({self.word}, {self.freq}, {hashValue})"
     def __repr__(self) -> tuple[str]:
-        return f"({self.word}, {self.freq}, {self.hashValue})"
+        return str(self)
     
     def __lt__(self, node2)->bool:
         return self.freq < node2.freq
@@ -1,5 +1,9 @@
 import argparse
+import cProfile
+import json
+import pstats
 
+from Models.DirectoryHasher import DirectoryHasher
 from Models.Encoder import Encoder
 
 def previewEncoder()->None:
@@ -10,25 +14,74 @@ def previewEncoder()->None:
     )
     parser.add_argument("-f","--file",action='store',help="stores path of the file you want to hash", type=str)
     parser.add_argument("-s","--string",action='store',help="sstring you want to hash", type=str)
+    parser.add_argument("-b","--chunks",action='store_true',help="use content-defined chunks of the raw bytes as leaves instead of words")
+    parser.add_argument("-d","--directory",action='store',help="hash every file of a directory into one forest root", type=str)
+    parser.add_argument("-g","--glob",action='store',help="files of the directory to hash", default="**/*", type=str)
+    parser.add_argument("-w","--workers",action='store',help="processes hashing files of a directory", type=int)
+    parser.add_argument("-m","--manifest",action='store',help="JSON file of sizes, times and roots used to skip unchanged files", type=str)
+    parser.add_argument("-p","--profile",action='store',help="print stage timings and counters, or write them as JSON to the given path", nargs="?", const="-", type=str)
+    parser.add_argument("-c","--cprofile",action='store',help="capture a cProfile of the run and save it to the given path", type=str)
     args = parser.parse_args()
     
+    if args.directory != None:
+        previewDirectory(args)
+        return
+    
     if args.file == None and args.string == None:
         print("Usage: -f, --file\tadd path of file to be hashed")
         print("Usage: -s, --string\tstring to be hashed")
+        print("Usage: -d, --directory\tdirectory to be hashed, with -g, -w and -m")
+        print("Usage: -p, --profile\tprint stage timings, or write them as JSON to a path")
+        print("Usage: -c, --cprofile\tsave a cProfile of the run to a path")
         return
     
+    profiler = cProfile.Profile() if args.cprofile != None else None
+    if profiler != None:
+        profiler.enable()
     if args.file != None:
-        encoder = Encoder(args.file, isFile=True) 
+        encoder = Encoder(args.file, isFile=True, leafMode="chunks" if args.chunks else "words")
     else:
-        encoder = Encoder(args.string, isFile=False)
+        encoder = Encoder(args.string, isFile=False, leafMode="chunks" if args.chunks else "words")
+    if profiler != None:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
     
     print(f"\n\033[1m\033[32mFinal Hash Value: {encoder.getFinalHash()}\033[0m")
     
+    if args.profile == "-":
+        print(f"\n{encoder.stats}")
+    elif args.profile != None:
+        with open(args.profile, "w", encoding="utf-8") as file:
+            json.dump(encoder.stats.toDict(), file, indent=2)
+        print(f"Stats written to {args.profile}")
+    
+
+def previewDirectory(args)->None:
+    hasher = DirectoryHasher(args.directory, args.glob, args.workers, args.manifest, "chunks" if args.chunks else "words")
+    for path, root, skipped in hasher.iterRoots():
+        print(f"{root}  {path}{'  (unchanged)' if skipped else ''}")
+    for path, error in hasher.errors.items():
+        print(f"\033[31mFailed {path}: {error}\033[0m")
+    if hasher.errors:
+        print(f"No forest hash: {len(hasher.errors)} file(s) could not be hashed")
+        return
+    if not hasher.roots:
+        print("No files hashed")
+        return
+    
+    filesPerSecond, megabytesPerSecond = hasher.throughput()
+    print(f"\n\033[1m\033[32mForest Hash Value: {hasher.forestRoot(hasher.roots)}\033[0m")
+    print(f"{hasher.filesHashed} hashed, {hasher.filesSkipped} unchanged in {hasher.elapsed:.2f}s: "
+          f"{filesPerSecond:.1f} files/s, {megabytesPerSecond:.2f} MB/s")
+    
+    
+# Directory workers re-import this script on spawn platforms, so it only runs as the main program
+if __name__ == "__main__":
+    previewEncoder()
     
-previewEncoder()
     
     
     
     
     
-    
\ No newline at end of file
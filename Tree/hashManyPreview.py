@@ -0,0 +1,31 @@
+import argparse
+import time
+
+from Models.HashFunc import HashFunc
+
+def previewHashMany()->None:
+    parser = argparse.ArgumentParser(
+        prog="Batched Hash Throughput",
+        description="This program compares custom_hash called per word with custom_hash_many over whole vocabularies"
+    )
+    parser.add_argument("-n","--sizes",action='store',help="vocabulary sizes to compare", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("-r","--rounds",action='store',help="number of hashing rounds", type=int, default=10)
+    args = parser.parse_args()
+    
+    for size in args.sizes:
+        vocabulary = [f"word{i}" for i in range(size)]
+        
+        start = time.perf_counter()
+        scalar = [HashFunc.custom_hash(word, args.rounds) for word in vocabulary]
+        scalarTime = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        batched = HashFunc.custom_hash_many(vocabulary, args.rounds)
+        batchedTime = time.perf_counter() - start
+        
+        assert scalar == batched, "custom_hash_many disagrees with custom_hash"
+        print(f"\033[1m\033[32m{size} words\033[0m\tscalar {size / scalarTime:,.0f} hashes/s\t"
+              f"batched {size / batchedTime:,.0f} hashes/s\t({scalarTime / batchedTime:.1f}x)")
+    
+    
+previewHashMany()
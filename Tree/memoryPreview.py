@@ -0,0 +1,33 @@
+import argparse
+import gc
+import tracemalloc
+
+from Models.Encoder import Encoder
+
+def measure(text:str, compact:bool)->tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    encoder = Encoder(text, isFile=False, compact=compact)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del encoder
+    return retained, peak
+
+def previewMemory()->None:
+    parser = argparse.ArgumentParser(
+        prog="Tree Memory Comparison",
+        description="This program compares the memory of the Node tree with the array-backed CompactTree"
+    )
+    parser.add_argument("-n","--sizes",action='store',help="vocabulary sizes to compare", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+    
+    for size in args.sizes:
+        text = " ".join(f"word{i}" for i in range(size))
+        for compact in (False, True):
+            retained, peak = measure(text, compact)
+            layout = "CompactTree" if compact else "Node tree  "
+            print(f"\033[1m\033[32m{size} words\033[0m\t{layout}\tretained {retained / 2**20:8.1f} MB\t"
+                  f"peak {peak / 2**20:8.1f} MB")
+    
+    
+previewMemory()
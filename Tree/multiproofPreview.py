@@ -0,0 +1,41 @@
+import argparse
+import random
+import time
+
+from Models.Encoder import Encoder
+
+def previewMultiproof()->None:
+    parser = argparse.ArgumentParser(
+        prog="Multiproof Comparison",
+        description="This program compares one multiproof against separate proof paths for the same words"
+    )
+    parser.add_argument("-v","--vocabulary",action='store',help="number of distinct words in the document", type=int, default=20000)
+    parser.add_argument("-k","--words",action='store',help="numbers of words to prove", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+    
+    rng = random.Random(0)
+    text = " ".join(f"word{rng.randrange(args.vocabulary)}" for _ in range(args.vocabulary * 5))
+    encoder = Encoder(text, isFile=False)
+    rootHash = encoder.getFinalHash()
+    
+    for count in args.words:
+        words = rng.sample(list(encoder.fileDict), count)
+        
+        proofs = [encoder.get_proof_path(encoder.getRoot(), word) for word in words]
+        start = time.perf_counter()
+        assert all(encoder.verify_chunk_with_path(word, proof, rootHash) for word, proof in zip(words, proofs))
+        separateTime = time.perf_counter() - start
+        separateHashes = sum(len(proof) for proof in proofs)
+        
+        multiproof = encoder.get_multiproof(words)
+        start = time.perf_counter()
+        assert encoder.verify_multiproof(words, multiproof, rootHash)
+        multiTime = time.perf_counter() - start
+        multiHashes = len(multiproof["siblings"])
+        
+        print(f"\033[1m\033[32m{count} words\033[0m\tsibling hashes {separateHashes} -> {multiHashes} "
+              f"({1 - multiHashes / separateHashes:.0%} smaller)\tverify {separateTime * 1000:.1f} ms -> "
+              f"{multiTime * 1000:.1f} ms ({separateTime / multiTime:.1f}x)")
+    
+    
+previewMultiproof()
@@ -0,0 +1,110 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from Tree.Models.HashFunc import HashFunc
+
+DIGEST_BYTES = 32
+
+def random_inputs(count, length, seed):
+    """Return a (count, length) uint8 array of seeded random ASCII letters."""
+    rng = np.random.default_rng(seed)
+    return rng.integers(ord("a"), ord("z") + 1, size=(count, length), dtype=np.uint8)
+
+def digest_matrix(inputs, rounds):
+    """Hash every row of inputs and return the digests as a (count, 32) uint8 array, right-aligned."""
+    hashes = HashFunc.custom_hash_many([row.tobytes() for row in inputs], rounds)
+    joined = b"".join(bytes.fromhex(digest.rjust(2 * DIGEST_BYTES, "0")) for digest in hashes)
+    return np.frombuffer(joined, dtype=np.uint8).reshape(len(hashes), DIGEST_BYTES), hashes
+
+def avalanche(count, length, rounds, seed=0):
+    """
+    Flip every input bit of count random inputs and measure how often each output bit flips.
+
+    An ideal hash flips every output bit with probability 0.5 for every input bit.
+    """
+    inputs = random_inputs(count, length, seed)
+    base, _ = digest_matrix(inputs, rounds)
+    flips = np.zeros((8 * length, 8 * DIGEST_BYTES), dtype=np.int64)
+    for bit in range(8 * length):
+        flipped = inputs.copy()
+        flipped[:, bit // 8] ^= np.uint8(1 << (7 - bit % 8))
+        digests, _ = digest_matrix(flipped, rounds)
+        flips[bit] = np.unpackbits(base ^ digests, axis=1).sum(axis=0, dtype=np.int64)
+    probability = flips / count
+    return {
+        "mean_flip_probability": float(probability.mean()),
+        "mean_flipped_bits": float(probability.sum(axis=1).mean()),
+        "worst_output_bit": float(np.abs(probability.mean(axis=0) - 0.5).max()),
+        "worst_input_output_pair": float(np.abs(probability - 0.5).max()),
+        "pairs_within_0.05": float((np.abs(probability - 0.5) <= 0.05).mean()),
+        "never_flipping_output_bits": int((probability.max(axis=0) == 0).sum()),
+    }
+
+def distribution(count, length, rounds, seed=1, batch_size=100000):
+    """
+    Measure per-bit bias and per-byte chi-square uniformity over count digests.
+
+    For 256 equally likely byte values the chi-square statistic has mean 255 and standard deviation about 22.6.
+    """
+    ones = np.zeros(8 * DIGEST_BYTES, dtype=np.int64)
+    byte_counts = np.zeros((DIGEST_BYTES, 256), dtype=np.int64)
+    digest_digits = []
+    for start in range(0, count, batch_size):
+        batch = min(batch_size, count - start)
+        digests, hashes = digest_matrix(random_inputs(batch, length, seed + start), rounds)
+        ones += np.unpackbits(digests, axis=1).sum(axis=0, dtype=np.int64)
+        for position in range(DIGEST_BYTES):
+            byte_counts[position] += np.bincount(digests[:, position], minlength=256)
+        digest_digits.extend(len(digest) for digest in hashes)
+    bias = ones / count - 0.5
+    expected = count / 256
+    chi_square = ((byte_counts - expected) ** 2 / expected).sum(axis=1)
+    return {
+        "max_bit_bias": float(np.abs(bias).max()),
+        "mean_abs_bit_bias": float(np.abs(bias).mean()),
+        "constant_bits": int((np.abs(bias) == 0.5).sum()),
+        "chi_square_median": float(np.median(chi_square)),
+        "chi_square_max": float(chi_square.max()),
+        "bytes_passing_chi_square": int((chi_square < 255 + 3 * 22.6).sum()),
+        "digest_hex_digits": [min(digest_digits), max(digest_digits)],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Avalanche and output distribution analysis of HashFunc.custom_hash")
+    parser.add_argument("-r", "--rounds", type=int, nargs="+", default=[1, 2, 4, 10, 12, 16], help="round counts to compare")
+    parser.add_argument("-a", "--avalanche-inputs", type=int, default=2000, help="inputs whose every bit is flipped")
+    parser.add_argument("-d", "--digests", type=int, default=1000000, help="digests for the bias and chi-square tests")
+    parser.add_argument("-l", "--length", type=int, default=16, help="input length in bytes")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    for rounds in args.rounds:
+        start = time.perf_counter()
+        results[rounds] = {
+            "avalanche": avalanche(args.avalanche_inputs, args.length, rounds),
+            "distribution": distribution(args.digests, args.length, rounds),
+        }
+        spread, uniform = results[rounds]["avalanche"], results[rounds]["distribution"]
+        print(f"\n=== {rounds} rounds ({time.perf_counter() - start:.1f}s) ===")
+        print(f"avalanche: mean flip probability {spread['mean_flip_probability']:.4f} (ideal 0.5), "
+              f"{spread['mean_flipped_bits']:.1f} of {8 * DIGEST_BYTES} bits flip per input bit")
+        print(f"           worst output bit off by {spread['worst_output_bit']:.4f}, "
+              f"{spread['pairs_within_0.05']:.1%} of input/output bit pairs within 0.05, "
+              f"{spread['never_flipping_output_bits']} output bits never flip")
+        print(f"bias:      max {uniform['max_bit_bias']:.4f}, mean {uniform['mean_abs_bit_bias']:.4f}, "
+              f"{uniform['constant_bits']} constant bits")
+        print(f"chi-square: median {uniform['chi_square_median']:.1f}, max {uniform['chi_square_max']:.1f} (ideal 255), "
+              f"{uniform['bytes_passing_chi_square']} of {DIGEST_BYTES} bytes pass")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"avalanche_inputs": args.avalanche_inputs, "digests": args.digests, "length": args.length,
+                       "rounds": results}, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from database import Database
+
+class AuthWorker:
+    """
+    Runs password hashing and checks in a thread pool, off the Tk event loop.
+
+    hashlib.scrypt releases the GIL, so concurrent logins use every worker
+    thread. Results reach the caller through a callback: with a Tk widget the
+    callback runs on the Tk thread, polled with widget.after, otherwise it
+    runs on the worker thread.
+    If the database call raises, on_error(error) is called instead, or
+    callback(False) when there is no on_error.
+    """
+
+    # Milliseconds between checks of a pending result from the Tk thread
+    POLL_INTERVAL = 20
+
+    _shared = None
+
+    def __init__(self, database=None, workers=None):
+        """
+        Initialize the worker.
+
+        Args:
+            database (Database): The user database, Database() by default. Its scrypt parameters set the cost.
+            workers (int): Threads hashing passwords, one per CPU by default.
+        """
+        self.database = database or Database()
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="auth")
+
+    @classmethod
+    def shared(cls):
+        """
+        Return the process-wide worker, creating it on first use.
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _deliver(self, future, callback, widget, on_error):
+        def finish(done):
+            try:
+                result = done.result()
+            except Exception as error:
+                if on_error is None:
+                    callback(False)
+                else:
+                    on_error(error)
+                return
+            callback(result)
+
+        if widget is None:
+            future.add_done_callback(finish)
+            return
+
+        def poll():
+            if not future.done():
+                widget.after(self.POLL_INTERVAL, poll)
+            elif widget.winfo_exists():
+                finish(future)
+        widget.after(self.POLL_INTERVAL, poll)
+
+    def login(self, username, password, callback, widget=None, on_error=None):
+        """
+        Check a login in the background and call callback(valid) when done.
+
+        Returns:
+            Future: The pending result.
+        """
+        future = self.executor.submit(self.database.verify_user, username, password)
+        self._deliver(future, callback, widget, on_error)
+        return future
+
+    def signup(self, username, password, callback, widget=None, on_error=None):
+        """
+        Hash and store a new user in the background and call callback(added) when done.
+
+        Returns:
+            Future: The pending result.
+        """
+        future = self.executor.submit(self.database.add_user, username, password)
+        self._deliver(future, callback, widget, on_error)
+        return future
+
+    def login_many(self, credentials):
+        """
+        Check many (username, password) pairs across the pool and return whether each is valid, in input order.
+        """
+        return list(self.executor.map(lambda pair: self.database.verify_user(*pair), credentials))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
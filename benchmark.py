@@ -0,0 +1,207 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+from Tree.Models.Encoder import Encoder
+from Tree.Models.HashFunc import HashFunc
+
+def measure(func, repeat):
+    """Run func repeat times and return the min and median wall time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings), "repeat": repeat}
+
+def generate_text(vocabulary, length, skew, seed=0):
+    """Generate a seeded document of length words drawn uniformly or Zipf-distributed from the vocabulary."""
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(vocabulary)]
+    if skew == "zipf":
+        weights = [1 / rank for rank in range(1, vocabulary + 1)]
+        return " ".join(rng.choices(words, weights=weights, k=length))
+    return " ".join(rng.choices(words, k=length))
+
+def bench_hash(quick):
+    """custom_hash over input sizes and round counts"""
+    results = {}
+    sizes = [16, 1024] if quick else [16, 256, 4096, 65536]
+    for size in sizes:
+        data = "".join(random.Random(size).choices("abcdefghij", k=size))
+        calls = max(20, (200000 if quick else 2000000) // size)
+        for rounds in (10, 12, 20):
+            result = measure(lambda: [HashFunc.custom_hash(data, rounds) for _ in range(calls)], 3 if quick else 5)
+            result["per_call"] = result["min"] / calls
+            results[f"hash/size={size}/rounds={rounds}"] = result
+    return results
+
+def bench_tree(quick):
+    """Encoder construction over vocabulary sizes and frequency skews, with hex and raw digests"""
+    results = {}
+    vocabularies = [1000, 10000] if quick else [1000, 10000, 100000]
+    for vocabulary in vocabularies:
+        for skew in ("uniform", "zipf"):
+            text = generate_text(vocabulary, vocabulary * 5, skew)
+            results[f"tree/vocabulary={vocabulary}/skew={skew}"] = measure(
+                lambda: Encoder(text, isFile=False), 2 if quick else 3)
+            results[f"tree/vocabulary={vocabulary}/skew={skew}/digests=raw"] = measure(
+                lambda: Encoder(text, isFile=False, rawDigests=True), 2 if quick else 3)
+    return results
+
+def bench_proof(quick):
+    """get_proof_path and verify_chunk_with_path on a Zipf document"""
+    vocabulary = 5000 if quick else 50000
+    encoder = Encoder(generate_text(vocabulary, vocabulary * 5, "zipf"), isFile=False)
+    root_hash = encoder.getFinalHash()
+    words = random.Random(1).sample(list(encoder.fileDict), 200)
+    proofs = [encoder.get_proof_path(encoder.getRoot(), word) for word in words]
+    return {
+        f"proof/generate/vocabulary={vocabulary}": measure(
+            lambda: [encoder.get_proof_path(encoder.getRoot(), word) for word in words], 5),
+        f"proof/verify/vocabulary={vocabulary}": measure(
+            lambda: [encoder.verify_chunk_with_path(word, proof, root_hash) for word, proof in zip(words, proofs)], 5),
+    }
+
+def bench_signature(quick):
+    """generate_signature and verify_signature of root hashes, one at a time and batched"""
+    from signature import generate_signature, sign_roots_batch, verify_roots_batch, verify_signature
+    calls = 20 if quick else 200
+    root_hash = Encoder("The quick brown fox jumps over the lazy dog", isFile=False).getFinalHash()
+    signature = generate_signature(root_hash)
+    roots = Encoder.rootHashMany([f"document {i}" for i in range(calls)])
+    entries = sign_roots_batch(roots)
+    return {
+        "signature/generate": measure(lambda: [generate_signature(root_hash) for _ in range(calls)], 3),
+        "signature/verify": measure(lambda: [verify_signature(root_hash, signature) for _ in range(calls)], 3),
+        "signature/batch_generate": measure(lambda: sign_roots_batch(roots), 3),
+        "signature/batch_verify": measure(lambda: verify_roots_batch(entries), 3),
+    }
+
+def bench_backends(quick):
+    """sign and verify throughput of every signature backend"""
+    import tempfile
+    from signature import BACKENDS, get_backend
+    calls = 50 if quick else 500
+    roots = Encoder.rootHashMany([f"document {i}" for i in range(calls)])
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in BACKENDS:
+            backend = get_backend(name, private_key_path=f"{directory}/{name}_private.pem",
+                                  public_key_path=f"{directory}/{name}_public.pem")
+            data = [root.encode() for root in roots]
+            signatures = [backend.sign(item) for item in data]
+            for operation, func in (("sign", lambda: [backend.sign(item) for item in data]),
+                                    ("verify", lambda: [backend.verify(item, signature)
+                                                        for item, signature in zip(data, signatures)])):
+                result = measure(func, 3)
+                result["per_second"] = calls / result["min"]
+                results[f"backend/{name}/{operation}"] = result
+    return results
+
+def bench_database(quick):
+    """concurrent sign-ups and logins against a shared WAL database, one by one and in bulk (scrypt n=16)"""
+    import os
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from database import Database
+    users = 1000 if quick else 10000
+    credentials = [(f"user{i}", f"password{i}") for i in range(users)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, ThreadPoolExecutor(8) as executor:
+        def run(name, func, setup=None):
+            path = os.path.join(directory, f"{name.replace('/', '_')}.db")
+            # A token scrypt cost, so the suite measures the database rather than the KDF
+            database = Database(path, scrypt_n=2 ** 4)
+            if setup:
+                setup(database)
+            start = time.perf_counter()
+            func(database)
+            elapsed = time.perf_counter() - start
+            database.close()
+            results[f"database/{name}"] = {"min": elapsed, "median": elapsed, "repeat": 1, "per_second": users / elapsed}
+
+        run("signup/threads", lambda db: list(executor.map(lambda pair: db.add_user(*pair), credentials)))
+        run("signup/bulk", lambda db: db.add_users_bulk(credentials))
+        run("login/threads", lambda db: list(executor.map(lambda pair: db.verify_user(*pair), credentials)),
+            lambda db: db.add_users_bulk(credentials))
+        run("login/bulk", lambda db: db.verify_users_bulk(credentials), lambda db: db.add_users_bulk(credentials))
+    return results
+
+def bench_auth(quick):
+    """scrypt logins at the default cost, on the calling thread and through AuthWorker"""
+    import os
+    import tempfile
+    from auth import AuthWorker
+    from database import Database
+    users = 16 if quick else 128
+    credentials = [(f"user{i}", f"password{i}") for i in range(users)]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(os.path.join(directory, "auth.db"))
+        database.add_users_bulk(credentials)
+        worker = AuthWorker(database)
+        for name, func in (("serial", lambda: database.verify_users_bulk(credentials)),
+                           (f"workers={worker.workers}", lambda: worker.login_many(credentials))):
+            result = measure(func, 3)
+            result["per_second"] = users / result["min"]
+            results[f"auth/login/{name}"] = result
+        worker.shutdown()
+        database.close()
+    return results
+
+SUITES = {"hash": bench_hash, "tree": bench_tree, "proof": bench_proof, "signature": bench_signature,
+          "backends": bench_backends, "database": bench_database,
+          "auth": bench_auth}
+
+def compare(results, baseline, threshold):
+    """Return (name, baseline, current, ratio) for every benchmark more than threshold slower than the baseline."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["min"] / baseline[name]["min"]
+        if ratio > 1 + threshold:
+            regressions.append((name, baseline[name]["min"], result["min"], ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hash, tree, proof and signing hot paths")
+    parser.add_argument("-s", "--suite", choices=sorted(SUITES), nargs="+", default=sorted(SUITES), help="suites to run")
+    parser.add_argument("-q", "--quick", action="store_true", help="smaller workloads for a fast check")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("-c", "--compare", help="baseline JSON file written by --output")
+    parser.add_argument("-t", "--threshold", type=float, default=0.10, help="allowed slowdown before flagging, 0.10 = 10%%")
+    args = parser.parse_args()
+
+    results = {}
+    for suite in args.suite:
+        print(f"\n=== {suite}: {SUITES[suite].__doc__} ===")
+        for name, result in SUITES[suite](args.quick).items():
+            results[name] = result
+            rate = f"   {result['per_second']:10.0f} /s" if "per_second" in result else ""
+            print(f"{name:<45} min {result['min'] * 1000:10.2f} ms   median {result['median'] * 1000:10.2f} ms{rate}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"python": sys.version, "platform": platform.platform(), "quick": args.quick,
+                       "results": results}, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        print(f"\n=== Compared with {args.compare} ===")
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print("No regressions found.")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,104 @@
 import sqlite3
 import hashlib
+import hmac
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+class ConnectionPool:
+    """
+    Connections to one SQLite file shared by every Database opened on it.
+
+    The pool is reference counted: it is created by the first Database on a
+    path and its connections are closed when the last one is closed.
+    Connections are created on demand up to max_size and each is used by one
+    thread at a time.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-8000",
+    )
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, path, max_size=8):
+        self.path = path
+        self.max_size = max_size
+        self.references = 0
+        self.created = 0
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def acquire(cls, path, max_size=8):
+        """
+        Return the shared pool of path, creating it if needed, and count one more user.
+        """
+        with cls._pools_lock:
+            pool = cls._pools.get(path)
+            if pool is None:
+                pool = cls._pools[path] = cls(path, max_size)
+            pool.references += 1
+            return pool
+
+    def release(self):
+        """
+        Count one user less and close every connection when none are left.
+        """
+        with self._pools_lock:
+            self.references -= 1
+            if self.references > 0:
+                return
+            if self._pools.get(self.path) is self:
+                del self._pools[self.path]
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """
+        Lend a connection to the with-block. Waits for a free one once max_size are in use.
+        """
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                create = self.created < self.max_size
+                if create:
+                    self.created += 1
+            conn = self._connect() if create else self.idle.get()
+        try:
+            yield conn
+        finally:
+            self.idle.put(conn)
+
 
 class Database:
-    def __init__(self):
-        self.conn = sqlite3.connect('users.db')
+    # scrypt cost parameters of new hashes: CPU/memory cost, block size and parallelism
+    SCRYPT_N = 2 ** 14
+    SCRYPT_R = 8
+    SCRYPT_P = 1
+
+    def __init__(self, path='users.db', scrypt_n=None, scrypt_r=None, scrypt_p=None):
+        self.scrypt_n = scrypt_n or self.SCRYPT_N
+        self.scrypt_r = scrypt_r or self.SCRYPT_R
+        self.scrypt_p = scrypt_p or self.SCRYPT_P
+        self.pool = ConnectionPool.acquire(path)
         self.create_user_table()
 
     def create_user_table(self):
@@ -14,27 +109,122 @@ class Database:
             password TEXT NOT NULL
         )
         '''
-        self.conn.execute(query)
-        self.conn.commit()
+        with self.pool.connection() as conn:
+            conn.execute(query)
+            conn.commit()
 
-    def hash_password(self, password):
+    @staticmethod
+    def _scrypt(password, salt, n, r, p):
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=128 * r * (n + p + 2) + (1 << 20),
+                              dklen=32)
+
+    def legacy_hash_password(self, password):
         return hashlib.sha256(password.encode()).hexdigest()
 
+    def hash_password(self, password):
+        """
+        Return "scrypt$n$r$p$salt$key" for password with a fresh salt and the cost parameters of this Database.
+        """
+        salt = os.urandom(16)
+        key = self._scrypt(password, salt, self.scrypt_n, self.scrypt_r, self.scrypt_p)
+        return f"scrypt${self.scrypt_n}${self.scrypt_r}${self.scrypt_p}${salt.hex()}${key.hex()}"
+
+    def check_password(self, stored, password):
+        """
+        Check password against a stored scrypt or legacy SHA-256 hash.
+
+        Returns (matches, needs_rehash), where needs_rehash is True for a match
+        stored as SHA-256 or with other cost parameters than this Database uses.
+        """
+        if not stored.startswith("scrypt$"):
+            matches = hmac.compare_digest(stored, self.legacy_hash_password(password))
+            return matches, matches
+        _, n, r, p, salt, key = stored.split("$")
+        n, r, p = int(n), int(r), int(p)
+        matches = hmac.compare_digest(bytes.fromhex(key), self._scrypt(password, bytes.fromhex(salt), n, r, p))
+        return matches, matches and (n, r, p) != (self.scrypt_n, self.scrypt_r, self.scrypt_p)
+
     def add_user(self, username, password):
         hashed_password = self.hash_password(password)
         try:
-            self.conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", 
-                            (username, hashed_password))
-            self.conn.commit()
+            with self.pool.connection() as conn, conn:
+                conn.execute("INSERT INTO users (username, password) VALUES (?, ?)",
+                             (username, hashed_password))
             return True
         except sqlite3.IntegrityError:
             return False
 
+    def add_users_bulk(self, users):
+        """
+        Add many (username, password) pairs in one transaction.
+
+        Usernames that already exist, or repeat earlier in users, are skipped.
+        Returns the number of users added.
+        """
+        rows = [(username, self.hash_password(password)) for username, password in users]
+        with self.pool.connection() as conn, conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)", rows)
+            return conn.total_changes - before
+
+    def get_password_hash(self, username):
+        """
+        Return the stored password hash of username, or None if there is no such user.
+        """
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT password FROM users WHERE username=?", (username,)).fetchone()
+        return row[0] if row else None
+
+    def _rehash(self, upgrades):
+        """
+        Store new hashes for (username, password, old hash) triples, unless the row changed meanwhile.
+        """
+        rows = [(self.hash_password(password), username, stored) for username, password, stored in upgrades]
+        with self.pool.connection() as conn, conn:
+            conn.executemany("UPDATE users SET password=? WHERE username=? AND password=?", rows)
+
     def verify_user(self, username, password):
-        hashed_password = self.hash_password(password)
-        cursor = self.conn.execute("SELECT * FROM users WHERE username=? AND password=?", 
-                                 (username, hashed_password))
-        return cursor.fetchone() is not None
+        """
+        Check a login. A legacy SHA-256 or outdated scrypt hash is replaced on success.
+        """
+        stored = self.get_password_hash(username)
+        if stored is None:
+            return False
+        matches, needs_rehash = self.check_password(stored, password)
+        if needs_rehash:
+            self._rehash([(username, password, stored)])
+        return matches
+
+    def verify_users_bulk(self, credentials, chunk_size=500):
+        """
+        Verify many (username, password) pairs, reading the stored hashes chunk_size usernames per query.
+
+        Hashes that need upgrading are rewritten in one transaction.
+        Returns whether each pair is valid, in input order.
+        """
+        usernames = list(dict.fromkeys(username for username, _ in credentials))
+        stored = {}
+        with self.pool.connection() as conn:
+            for start in range(0, len(usernames), chunk_size):
+                chunk = usernames[start:start + chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                stored.update(conn.execute(f"SELECT username, password FROM users WHERE username IN ({placeholders})",
+                                           chunk).fetchall())
+        results = []
+        upgrades = {}
+        for username, password in credentials:
+            matches, needs_rehash = self.check_password(stored[username], password) if username in stored else (False, False)
+            if needs_rehash:
+                upgrades[username] = (username, password, stored[username])
+            results.append(matches)
+        if upgrades:
+            self._rehash(upgrades.values())
+        return results
+
+    def close(self):
+        if getattr(self, "pool", None) is not None:
+            self.pool.release()
+            self.pool = None
 
     def __del__(self):
-        self.conn.close()
+        self.close()
@@ -1,39 +1,18 @@
-from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.hazmat.primitives import serialization
+import argparse
 
-def generate_and_save_keys():
+from signature import BACKENDS, get_backend
+
+def generate_and_save_keys(backend_name=None):
     """
-    Generate a new key pair and save them to files.
+    Generate a new key pair and save them to the files of the backend (RSA-PSS by default).
     """
-    # Generate private key
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048
-    )
-    
-    # Get public key
-    public_key = private_key.public_key()
-    
-    # Serialize private key
-    private_pem = private_key.private_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PrivateFormat.PKCS8,
-        encryption_algorithm=serialization.NoEncryption()
-    )
-    
-    # Serialize public key
-    public_pem = public_key.public_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PublicFormat.SubjectPublicKeyInfo
-    )
-    
-    # Save keys to files
-    with open('private_key.pem', 'wb') as f:
-        f.write(private_pem)
-    
-    with open('public_key.pem', 'wb') as f:
-        f.write(public_pem)
+    backend = get_backend(backend_name)
+    backend.save_keys(backend.generate_private_key())
+    return backend
 
 if __name__ == "__main__":
-    generate_and_save_keys()
-    print("New key pair generated and saved successfully!") 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate and save a signing key pair")
+    parser.add_argument("-b", "--backend", choices=sorted(BACKENDS), help="signature backend, SIGNATURE_BACKEND or rsa-pss by default")
+    args = parser.parse_args()
+    backend = generate_and_save_keys(args.backend)
+    print(f"New {backend.name} key pair saved to {backend.private_key_path} and {backend.public_key_path}!")
@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox
-from database import Database
+from auth import AuthWorker
 
 class LoginWindow(tk.Toplevel):
     def __init__(self, parent):
@@ -10,7 +10,7 @@ class LoginWindow(tk.Toplevel):
         self.geometry("300x200")
         self.resizable(False, False)
         
-        self.db = Database()
+        self.auth = AuthWorker.shared()
         self.create_widgets()
         
         # Center the window
@@ -43,10 +43,20 @@ class LoginWindow(tk.Toplevel):
         username = self.username_entry.get()
         password = self.password_entry.get()
         
-        if self.db.verify_user(username, password):
+        # The password check runs on the auth worker, login_done gets the result on the Tk thread
+        self.login_button.config(state="disabled")
+        self.auth.login(username, password, lambda valid: self.login_done(username, valid), self, self.login_failed)
+
+    def login_done(self, username, valid):
+        if valid:
             messagebox.showinfo("Success", "Login successful!")
             self.parent.current_user = username
             self.parent.show_main_application()
             self.destroy()
         else:
+            self.login_button.config(state="normal")
             messagebox.showerror("Error", "Invalid username or password")
+
+    def login_failed(self, error):
+        self.login_button.config(state="normal")
+        messagebox.showerror("Error", f"Login failed: {error}")
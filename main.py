@@ -1,5 +1,8 @@
+import os
+import queue
+import threading
 import tkinter as tk
-from tkinter import filedialog, scrolledtext, messagebox
+from tkinter import filedialog, scrolledtext, messagebox, ttk
 from Tree.Models.Encoder import Encoder  # Importing Encoder for Merkle Tree functionality
 from signature import generate_signature, verify_signature  # Importing Digital Signature Module
 from login import LoginWindow
@@ -47,7 +50,18 @@ class Application(tk.Tk):
         main_window.protocol("WM_DELETE_WINDOW", on_closing)
 
 
+class OperationCancelled(Exception):
+    """
+    Raised inside a background operation once Cancel is pressed.
+    """
+
+
 class MerkleSignatureApp(tk.Frame):
+    # Milliseconds between checks of a running background operation
+    POLL_INTERVAL = 50
+    # Characters of an uploaded file shown in the input field
+    PREVIEW_SIZE = 4096
+
     def __init__(self, master):
         super().__init__(master)
         self.master.title("Merkle Tree & Digital Signature App")
@@ -62,6 +76,10 @@ class MerkleSignatureApp(tk.Frame):
         self.upload_file_btn = tk.Button(self, text="Upload Text File", command=self.upload_file)
         self.upload_file_btn.grid(row=0, column=3, padx=5, pady=5)
 
+        # Drops the uploaded file and makes the input field editable again
+        self.clear_file_btn = tk.Button(self, text="Clear File", command=self.clear_file, state="disabled")
+        self.clear_file_btn.grid(row=1, column=3, padx=5, pady=5)
+
         # Buttons for Operations
         self.create_tree_btn = tk.Button(self, text="Create Merkle Tree", command=self.create_merkle_tree)
         self.create_tree_btn.grid(row=1, column=1, pady=10)
@@ -89,36 +107,168 @@ class MerkleSignatureApp(tk.Frame):
         self.signature_label = tk.Label(self, text="", wraplength=500, anchor="w", justify="left")
         self.signature_label.grid(row=5, column=1, columnspan=2, sticky="w")
 
+        # Progress of the running background operation
+        self.progress_bar = ttk.Progressbar(self, length=400, maximum=100)
+        self.progress_bar.grid(row=6, column=1, columnspan=2, pady=10, sticky="w")
+        self.cancel_btn = tk.Button(self, text="Cancel", command=self.cancel_operation, state="disabled")
+        self.cancel_btn.grid(row=6, column=3, padx=5)
+        self.status_label = tk.Label(self, text="", anchor="w")
+        self.status_label.grid(row=7, column=1, columnspan=2, sticky="w")
+
         # Internal State
         self.encoder = None
         self.root_hash = None
         self.digital_signature = None
+        self.input_file = None
+        self.cancel_event = None
+        self.progress_state = None
+        self.results = queue.Queue()
+
+    def run_in_background(self, description, task, on_success, error_message):
+        """
+        Run task(report) on a worker thread while the window stays responsive.
+
+        report(stage, done, total) moves the progress bar and raises
+        OperationCancelled once Cancel is pressed. The outcome is picked up by
+        poll_background through after(), so on_success(result) runs on the Tk thread.
+        """
+        cancel_event = self.cancel_event = threading.Event()
+        self.progress_state = (description, 0, 0)
+
+        def report(stage, done, total):
+            if cancel_event.is_set():
+                raise OperationCancelled()
+            self.progress_state = (f"{description}: {stage} {done}/{total}", done, total)
+
+        def work():
+            try:
+                outcome = ("done", task(report))
+            except OperationCancelled:
+                outcome = ("cancelled", None)
+            except Exception as e:
+                outcome = ("error", e)
+            # Operations without progress reports can't be interrupted, their result is dropped instead
+            if cancel_event.is_set():
+                outcome = ("cancelled", None)
+            self.results.put(outcome + (on_success, error_message))
+
+        self.set_busy(True)
+        threading.Thread(target=work, daemon=True).start()
+        self.after(self.POLL_INTERVAL, self.poll_background)
+
+    def poll_background(self):
+        """
+        Update the progress bar and hand a finished operation's result to its callback.
+        """
+        description, done, total = self.progress_state
+        self.status_label.config(text=description)
+        if total:
+            self.progress_bar.config(mode="determinate", value=100 * done / total)
+        else:
+            self.progress_bar.config(mode="indeterminate")
+            self.progress_bar.step(5)
+        try:
+            kind, value, on_success, error_message = self.results.get_nowait()
+        except queue.Empty:
+            self.after(self.POLL_INTERVAL, self.poll_background)
+            return
+
+        self.set_busy(False)
+        self.progress_bar.config(mode="determinate", value=0)
+        if kind == "done":
+            self.status_label.config(text="")
+            on_success(value)
+        elif kind == "cancelled":
+            self.status_label.config(text="Cancelled")
+        else:
+            self.status_label.config(text="")
+            messagebox.showerror("Error", f"{error_message}: {value}")
+
+    def cancel_operation(self):
+        """
+        Ask the running background operation to stop.
+        """
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_btn.config(state="disabled")
+            self.status_label.config(text="Cancelling...")
+
+    def set_busy(self, busy):
+        """
+        Disable the operation buttons while a background operation runs.
+        """
+        idle = "disabled" if busy else "normal"
+        self.upload_file_btn.config(state=idle)
+        self.clear_file_btn.config(state=idle if self.input_file else "disabled")
+        self.create_tree_btn.config(state=idle)
+        self.import_signature_btn.config(state=idle)
+        self.sign_data_btn.config(state=idle if self.root_hash else "disabled")
+        self.verify_signature_btn.config(state=idle if self.digital_signature else "disabled")
+        self.export_signature_btn.config(state=idle if self.digital_signature else "disabled")
+        self.cancel_btn.config(state="normal" if busy else "disabled")
 
     def upload_file(self):
         """
-        Open a file dialog to upload a text file and load its content into the input field.
+        Open a file dialog to choose a text file for the tree.
+
+        The file is not loaded into the input field: the tree is built from
+        the file itself, and the field shows a read-only preview of its first
+        PREVIEW_SIZE characters and its size.
         """
         file_path = filedialog.askopenfilename(filetypes=[("Text Files", "*.txt")])
         if file_path:
             try:
-                with open(file_path, "r", encoding="utf-8") as file:
-                    content = file.read()
-                    self.data_text.delete("1.0", tk.END)
-                    self.data_text.insert(tk.END, content)
-                messagebox.showinfo("File Loaded", "File content loaded into input field.")
+                size = os.path.getsize(file_path)
+                with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+                    preview = file.read(self.PREVIEW_SIZE)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load file: {e}")
+                return
+
+            self.input_file = file_path
+            header = f"{os.path.basename(file_path)} ({size:,} bytes)"
+            if size > self.PREVIEW_SIZE:
+                header += f", showing the first {self.PREVIEW_SIZE:,} characters"
+            self.data_text.config(state="normal")
+            self.data_text.delete("1.0", tk.END)
+            self.data_text.insert(tk.END, f"{header}\n\n{preview}")
+            self.data_text.config(state="disabled")
+            self.clear_file_btn.config(state="normal")
+            messagebox.showinfo("File Loaded", "File selected, the tree will be built from the file.")
+
+    def clear_file(self):
+        """
+        Forget the uploaded file and make the input field editable again.
+        """
+        self.input_file = None
+        self.data_text.config(state="normal")
+        self.data_text.delete("1.0", tk.END)
+        self.clear_file_btn.config(state="disabled")
 
     def create_merkle_tree(self):
         """
-        Create a Merkle Tree using input data.
+        Create a Merkle Tree from the uploaded file, streamed from disk, or else from the input field.
         """
-        input_data = self.data_text.get("1.0", tk.END).strip()
-        if not input_data:
-            messagebox.showerror("Error", "Input data cannot be empty!")
-            return
+        if self.input_file:
+            file_path = self.input_file
+            if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+                messagebox.showerror("Error", "Input file is missing or empty!")
+                return
+            task = lambda report: Encoder(file_path, isFile=True, stream=True, progress=report)
+        else:
+            input_data = self.data_text.get("1.0", tk.END).strip()
+            if not input_data:
+                messagebox.showerror("Error", "Input data cannot be empty!")
+                return
+            task = lambda report: Encoder(input_data, isFile=False, progress=report)
+
+        self.run_in_background("Building tree", task, self.tree_created, "Failed to create Merkle Tree")
 
-        self.encoder = Encoder(input_data, isFile=False)
+    def tree_created(self, encoder):
+        """
+        Show the root hash of a tree built by create_merkle_tree.
+        """
+        self.encoder = encoder
         self.root_hash = self.encoder.getFinalHash()
         display_hash = self.root_hash[:60] if len(self.root_hash) > 60 else self.root_hash
         self.root_hash_label.config(text=display_hash)
@@ -129,35 +279,44 @@ class MerkleSignatureApp(tk.Frame):
         """
         Generate a digital signature for the Merkle Tree's root hash.
         """
-        try:
-            if not self.root_hash:
-                messagebox.showerror("Error", "Root hash cannot be empty!")
-                return
+        if not self.root_hash:
+            messagebox.showerror("Error", "Root hash cannot be empty!")
+            return
 
-            self.digital_signature = generate_signature(self.root_hash)
-            self.signature_label.config(text=self.digital_signature.hex())
-            self.verify_signature_btn.config(state="normal")
-            self.export_signature_btn.config(state="normal")  # Enable export button
-            messagebox.showinfo("Success", "Digital signature generated successfully!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate digital signature: {e}")
+        root_hash = self.root_hash
+        self.run_in_background("Signing", lambda report: generate_signature(root_hash), self.signature_created,
+                               "Failed to generate digital signature")
+
+    def signature_created(self, signature):
+        """
+        Show a signature made by generate_signature.
+        """
+        self.digital_signature = signature
+        self.signature_label.config(text=self.digital_signature.hex())
+        self.verify_signature_btn.config(state="normal")
+        self.export_signature_btn.config(state="normal")  # Enable export button
+        messagebox.showinfo("Success", "Digital signature generated successfully!")
 
     def verify_signature(self):
         """
         Verify the digital signature for the Merkle Tree's root hash.
         """
-        try:
-            if not self.root_hash or not self.digital_signature:
-                messagebox.showerror("Error", "Root hash or signature is missing!")
-                return
-            
-            is_valid = verify_signature(self.root_hash, self.digital_signature)
-            if is_valid:
-                messagebox.showinfo("Success", "Digital signature is valid!")
-            else:
-                messagebox.showerror("Error", "Digital signature is invalid!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to verify digital signature: {e}")
+        if not self.root_hash or not self.digital_signature:
+            messagebox.showerror("Error", "Root hash or signature is missing!")
+            return
+
+        root_hash, signature = self.root_hash, self.digital_signature
+        self.run_in_background("Verifying", lambda report: verify_signature(root_hash, signature),
+                               self.signature_verified, "Failed to verify digital signature")
+
+    def signature_verified(self, is_valid):
+        """
+        Report the outcome of verify_signature.
+        """
+        if is_valid:
+            messagebox.showinfo("Success", "Digital signature is valid!")
+        else:
+            messagebox.showerror("Error", "Digital signature is invalid!")
 
     def export_signature(self):
         """
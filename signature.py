@@ -1,43 +1,216 @@
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa, padding
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import utils
+from Tree.Models.Encoder import Encoder
+from Tree.Models.HashFunc import HashFunc
+from abc import ABC, abstractmethod
 import os
+import threading
+
+# Prefixed to a batch root before signing, so a batch signature can never pass as the signature of a single root
+BATCH_PREFIX = "merkle-batch:"
+# Prefixed to every root before it becomes a leaf of the batch tree. Internal nodes hash concatenated hex digests,
+# which never contain the "l", so no internal node input can be passed off as a signed root
+BATCH_LEAF_PREFIX = "leaf"
+HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+class SignatureBackend(ABC):
+    """
+    One signature algorithm with its key pair.
+
+    Keys are read from PEM files on first use and cached. If the private key
+    file is missing when a signature is made, a new key pair is generated and
+    saved, so every later process signs and verifies with the same keys.
+    """
+
+    name = None
+    key_prefix = None
+
+    def __init__(self, private_key_path: str = None, public_key_path: str = None):
+        """
+        Initialize the backend without touching the key files.
+
+        Args:
+            private_key_path (str): PEM file of the private key, "<key_prefix>private_key.pem" by default.
+            public_key_path (str): PEM file of the public key, "<key_prefix>public_key.pem" by default.
+        """
+        self.private_key_path = private_key_path or f"{self.key_prefix}private_key.pem"
+        self.public_key_path = public_key_path or f"{self.key_prefix}public_key.pem"
+        self._private_key = None
+        self._public_key = None
+        # Reentrant, because deriving the public key may load the private key under the same lock
+        self._lock = threading.RLock()
+
+    @property
+    def private_key(self):
+        """
+        The private key, loaded on first use or generated and saved if its file is missing.
+        """
+        if self._private_key is None:
+            with self._lock:
+                if self._private_key is None:
+                    try:
+                        with open(self.private_key_path, 'rb') as f:
+                            self._private_key = serialization.load_pem_private_key(f.read(), password=None)
+                    except FileNotFoundError:
+                        self._private_key = self.generate_private_key()
+                        self.save_keys(self._private_key)
+        return self._private_key
+
+    @property
+    def public_key(self):
+        """
+        The public key, loaded on first use or derived from the private key if its file is missing.
+        """
+        if self._public_key is None:
+            with self._lock:
+                if self._public_key is None:
+                    try:
+                        with open(self.public_key_path, 'rb') as f:
+                            self._public_key = serialization.load_pem_public_key(f.read())
+                    except FileNotFoundError:
+                        self._public_key = self.private_key.public_key()
+        return self._public_key
+
+    def save_keys(self, private_key) -> None:
+        """
+        Write a key pair to the PEM files of this backend.
+
+        Args:
+            private_key: The private key to save together with its public key.
+        """
+        private_pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        )
+        public_pem = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        with open(self.private_key_path, 'wb') as f:
+            f.write(private_pem)
+        with open(self.public_key_path, 'wb') as f:
+            f.write(public_pem)
+
+    @abstractmethod
+    def generate_private_key(self):
+        """
+        Return a new private key of this algorithm.
+        """
+
+    @abstractmethod
+    def sign(self, data: bytes) -> bytes:
+        """
+        Return the signature of data made with the private key.
+        """
+
+    @abstractmethod
+    def verify(self, data: bytes, signature: bytes) -> None:
+        """
+        Raise cryptography's InvalidSignature if signature does not match data.
+        """
+
+
+class RSAPSSBackend(SignatureBackend):
+    """
+    2048-bit RSA with PSS padding and SHA-256, using the original private_key.pem/public_key.pem files.
+    """
+
+    name = "rsa-pss"
+    key_prefix = ""
+
+    def generate_private_key(self):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def _padding(self):
+        return padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH)
+
+    def sign(self, data: bytes) -> bytes:
+        return self.private_key.sign(data, self._padding(), hashes.SHA256())
+
+    def verify(self, data: bytes, signature: bytes) -> None:
+        self.public_key.verify(signature, data, self._padding(), hashes.SHA256())
+
+
+class Ed25519Backend(SignatureBackend):
+    """
+    Ed25519, deterministic signatures of 64 bytes.
+    """
+
+    name = "ed25519"
+    key_prefix = "ed25519_"
+
+    def generate_private_key(self):
+        return ed25519.Ed25519PrivateKey.generate()
+
+    def sign(self, data: bytes) -> bytes:
+        return self.private_key.sign(data)
+
+    def verify(self, data: bytes, signature: bytes) -> None:
+        self.public_key.verify(signature, data)
+
+
+class ECDSAP256Backend(SignatureBackend):
+    """
+    ECDSA over the NIST P-256 curve with SHA-256.
+    """
+
+    name = "ecdsa-p256"
+    key_prefix = "ecdsa_p256_"
+
+    def generate_private_key(self):
+        return ec.generate_private_key(ec.SECP256R1())
+
+    def sign(self, data: bytes) -> bytes:
+        return self.private_key.sign(data, ec.ECDSA(hashes.SHA256()))
+
+    def verify(self, data: bytes, signature: bytes) -> None:
+        self.public_key.verify(signature, data, ec.ECDSA(hashes.SHA256()))
+
+
+BACKENDS = {backend.name: backend for backend in (RSAPSSBackend, Ed25519Backend, ECDSAP256Backend)}
+
+def get_backend(name: str = None, **kwargs) -> SignatureBackend:
+    """
+    Create a signature backend by name.
+
+    Args:
+        name (str): One of BACKENDS, by default the SIGNATURE_BACKEND environment variable or "rsa-pss".
+        **kwargs: Key file paths passed to the backend.
+
+    Returns:
+        SignatureBackend: The backend, with its keys not loaded yet.
+    """
+    name = name or os.environ.get("SIGNATURE_BACKEND", RSAPSSBackend.name)
+    if name not in BACKENDS:
+        raise ValueError(f"unknown signature backend {name!r}, expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
+
 
 class DigitalSignature:
-    def __init__(self):
+    def __init__(self, backend: SignatureBackend = None):
         """
-        Initialize the DigitalSignature object and load the key pair from files.
+        Initialize the DigitalSignature object. The keys are loaded when first needed.
+
+        Args:
+            backend (SignatureBackend): The algorithm to use, get_backend() by default.
         """
-        self.private_key = None
-        self.public_key = None
-        self.load_keys()
+        self.backend = backend or get_backend()
+
+    @property
+    def private_key(self):
+        return self.backend.private_key
+
+    @property
+    def public_key(self):
+        return self.backend.public_key
 
     def load_keys(self):
         """
-        Load keys from files. If files don't exist, generate new keys.
+        Load the keys now instead of on first use. Missing keys are generated and saved.
         """
-        try:
-            # Load private key
-            with open('private_key.pem', 'rb') as f:
-                private_pem = f.read()
-                self.private_key = serialization.load_pem_private_key(
-                    private_pem,
-                    password=None
-                )
-
-            # Load public key
-            with open('public_key.pem', 'rb') as f:
-                public_pem = f.read()
-                self.public_key = serialization.load_pem_public_key(
-                    public_pem
-                )
-        except FileNotFoundError:
-            # If keys don't exist, generate new ones
-            self.private_key = rsa.generate_private_key(
-                public_exponent=65537,
-                key_size=2048
-            )
-            self.public_key = self.private_key.public_key()
+        self.backend.private_key
+        self.backend.public_key
 
     def generate_signature(self, data: str) -> bytes:
         """
@@ -49,15 +222,7 @@ class DigitalSignature:
         Returns:
             bytes: The generated digital signature.
         """
-        signature = self.private_key.sign(
-            data.encode(),
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
-        return signature
+        return self.backend.sign(data.encode())
 
     def verify_signature(self, data: str, signature: bytes) -> bool:
         """
@@ -71,15 +236,7 @@ class DigitalSignature:
             bool: True if the signature is valid, False otherwise.
         """
         try:
-            self.public_key.verify(
-                signature,
-                data.encode(),
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
+            self.backend.verify(data.encode(), signature)
             return True
         except Exception:
             return False
@@ -125,3 +282,89 @@ def verify_signature(data: str, signature: bytes) -> bool:
         bool: True if valid, False otherwise.
     """
     return signature_handler.verify_signature(data, signature)
+
+
+def sign_roots_batch(root_hashes: list[str]) -> list[dict]:
+    """
+    Sign many root hashes with a single private-key operation.
+
+    A Merkle tree is built over the roots with Encoder and only its root is
+    signed. Every document gets its root, its inclusion proof and the shared
+    batch root and signature. The leaves are BATCH_LEAF_PREFIX + root, so
+    leaf and internal node hash inputs can never be confused.
+
+    Args:
+        root_hashes (list[str]): The document root hashes to sign.
+
+    Returns:
+        list[dict]: One {"root", "proof", "batch_root", "signature"} entry per root, in input order.
+    """
+    if not root_hashes:
+        raise ValueError("root_hashes must not be empty")
+    if any(not root or not HEX_DIGITS.issuperset(root) for root in root_hashes):
+        raise ValueError("root hashes must be hex strings")
+    batch = Encoder(" ".join(BATCH_LEAF_PREFIX + root for root in root_hashes), isFile=False, compact=True)
+    batch_root = batch.getFinalHash()
+    signature = signature_handler.generate_signature(BATCH_PREFIX + batch_root)
+    proofs = dict(batch.getAllProofs())
+    return [{"root": root, "proof": proofs[BATCH_LEAF_PREFIX + root], "batch_root": batch_root, "signature": signature}
+            for root in root_hashes]
+
+def verify_root_proof(root_hash: str, proof_path, batch_root: str) -> bool:
+    """
+    Check that a document root is a leaf of the batch tree with the given root.
+
+    Args:
+        root_hash (str): The document root hash.
+        proof_path (list): The (side, sibling hash) entries returned by sign_roots_batch.
+        batch_root (str): The root of the batch tree.
+
+    Returns:
+        bool: True if the proof leads from root_hash to batch_root.
+    """
+    current_hash = HashFunc.custom_hash(BATCH_LEAF_PREFIX + root_hash)
+    for direction, sibling_hash in proof_path:
+        if direction == "L":
+            current_hash = HashFunc.custom_hash(sibling_hash + current_hash)
+        else:
+            current_hash = HashFunc.custom_hash(current_hash + sibling_hash)
+    return current_hash == batch_root
+
+def verify_roots_batch(entries: list[dict]) -> list[bool]:
+    """
+    Verify many batch-signed documents, checking each distinct batch signature only once.
+
+    The proofs are walked one level at a time, so every level is a single
+    HashFunc.custom_hash_many call and nodes shared by several proofs are
+    hashed once.
+
+    Args:
+        entries (list[dict]): Entries as returned by sign_roots_batch.
+
+    Returns:
+        list[bool]: Whether each entry is valid, in input order.
+    """
+    current = HashFunc.custom_hash_many([BATCH_LEAF_PREFIX + entry["root"] for entry in entries])
+    step = 0
+    while True:
+        pending = [i for i, entry in enumerate(entries) if step < len(entry["proof"])]
+        if not pending:
+            break
+        inputs = []
+        for i in pending:
+            direction, sibling_hash = entries[i]["proof"][step]
+            inputs.append(sibling_hash + current[i] if direction == "L" else current[i] + sibling_hash)
+        unique = list(dict.fromkeys(inputs))
+        hashed = dict(zip(unique, HashFunc.custom_hash_many(unique)))
+        for i, input_data in zip(pending, inputs):
+            current[i] = hashed[input_data]
+        step += 1
+
+    signatures_valid = {}
+    results = []
+    for entry, computed_root in zip(entries, current):
+        key = (entry["batch_root"], bytes(entry["signature"]))
+        if key not in signatures_valid:
+            signatures_valid[key] = signature_handler.verify_signature(BATCH_PREFIX + entry["batch_root"], key[1])
+        results.append(signatures_valid[key] and computed_root == entry["batch_root"])
+    return results
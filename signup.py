@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox
-from database import Database
+from auth import AuthWorker
 
 class SignupWindow(tk.Toplevel):
     def __init__(self, parent):
@@ -10,7 +10,7 @@ class SignupWindow(tk.Toplevel):
         self.geometry("300x250")
         self.resizable(False, False)
         
-        self.db = Database()
+        self.auth = AuthWorker.shared()
         self.create_widgets()
         
         # Center the window
@@ -57,8 +57,18 @@ class SignupWindow(tk.Toplevel):
             messagebox.showerror("Error", "Passwords do not match")
             return
             
-        if self.db.add_user(username, password):
+        # Hashing runs on the auth worker, signup_done gets the result on the Tk thread
+        self.signup_button.config(state="disabled")
+        self.auth.signup(username, password, self.signup_done, self, self.signup_failed)
+
+    def signup_done(self, added):
+        if added:
             messagebox.showinfo("Success", "Account created successfully!")
             self.destroy()
         else:
+            self.signup_button.config(state="normal")
             messagebox.showerror("Error", "Username already exists")
+
+    def signup_failed(self, error):
+        self.signup_button.config(state="normal")
+        messagebox.showerror("Error", f"Sign up failed: {error}")
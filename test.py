@@ -1,8 +1,21 @@
 import unittest
+import hashlib
 import os
+import sqlite3
+from unittest.mock import patch
+from auth import AuthWorker
 from database import Database
-from signature import generate_signature, verify_signature
+from signature import (BACKENDS, BATCH_LEAF_PREFIX, DigitalSignature, generate_signature, get_backend,
+                       SignatureBackend, sign_roots_batch, verify_root_proof, verify_roots_batch, verify_signature)
+from Tree.Models.Chunker import Chunker
+from Tree.Models.DirectoryHasher import DirectoryHasher
 from Tree.Models.Encoder import Encoder
+from Tree.Models.HashFunc import HashFunc
+from Tree.Models.LeafCache import LeafCache
+import random
+import tempfile
+from Attack import (ALPHABET, birthday_collisions, birthday_input, check_file_collisions,
+                    parallel_random_string_search)
 
 class TestAuthentication(unittest.TestCase):
     def setUp(self):
@@ -42,6 +55,54 @@ class TestAuthentication(unittest.TestCase):
         # Test non-existent user
         self.assertFalse(self.db.verify_user("nonexistent", self.test_password))
 
+    def test_bulk_users(self):
+        # Test bulk sign-up skips existing names and bulk login matches verify_user
+        self.db.scrypt_n = 2 ** 4
+        self.db.add_user(self.test_username, self.test_password)
+        users = [(f"user{i}", f"password{i}") for i in range(100)] + [(self.test_username, "other")]
+        self.assertEqual(self.db.add_users_bulk(users), 100)
+        credentials = users + [("user1", "wrongpassword"), ("nonexistent", "password")]
+        expected = [self.db.verify_user(username, password) for username, password in credentials]
+        self.assertEqual(self.db.verify_users_bulk(credentials), expected)
+        self.assertEqual(expected.count(True), 100)
+
+    def test_legacy_hash_upgrade(self):
+        # Test a SHA-256 row still logs in and is rewritten as scrypt on success only
+        legacy = hashlib.sha256(self.test_password.encode()).hexdigest()
+        with self.db.pool.connection() as conn, conn:
+            conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (self.test_username, legacy))
+        self.assertFalse(self.db.verify_user(self.test_username, "wrongpassword"))
+        self.assertEqual(self.db.get_password_hash(self.test_username), legacy)
+        self.assertTrue(self.db.verify_user(self.test_username, self.test_password))
+        self.assertTrue(self.db.get_password_hash(self.test_username).startswith("scrypt$"))
+        self.assertTrue(self.db.verify_user(self.test_username, self.test_password))
+
+    def test_auth_worker(self):
+        # Test logins and sign-ups run on the worker and report through callbacks
+        worker = AuthWorker(self.db, workers=2)
+        results = []
+        worker.signup(self.test_username, self.test_password, results.append).result()
+        futures = [worker.login(self.test_username, password, results.append)
+                   for password in (self.test_password, "wrongpassword")]
+        self.assertEqual([future.result() for future in futures], [True, False])
+        self.assertEqual(sorted(results), [False, True, True])
+
+        # A failing database call still reaches the caller, through on_error or as False
+        errors, failed = [], []
+        with patch.object(self.db, "verify_user", side_effect=sqlite3.OperationalError("database is locked")):
+            future = worker.login(self.test_username, self.test_password, failed.append, on_error=errors.append)
+            self.assertRaises(sqlite3.OperationalError, future.result)
+            worker.login(self.test_username, self.test_password, failed.append).exception()
+        worker.shutdown()
+        self.assertEqual(([type(error) for error in errors], failed), ([sqlite3.OperationalError], [False]))
+
+    def test_shared_pool(self):
+        # Test Databases on one file share a pool that closes with the last of them
+        other = Database()
+        self.assertIs(other.pool, self.db.pool)
+        other.close()
+        self.assertTrue(other.pool is None and self.db.add_user(self.test_username, self.test_password))
+
 class TestDigitalSignature(unittest.TestCase):
     def setUp(self):
         self.test_data = "Test message for digital signature"
@@ -93,6 +154,47 @@ class TestDigitalSignature(unittest.TestCase):
         signature = generate_signature(large_hash)
         self.assertTrue(verify_signature(large_hash, signature))
 
+    def test_batch_signature(self):
+        # Test many roots signed with one signature verify together
+        roots = Encoder.rootHashMany([f"document number {i}" for i in range(50)])
+        entries = sign_roots_batch(roots)
+        self.assertEqual(len({entry["signature"] for entry in entries}), 1)
+        self.assertTrue(all(verify_roots_batch(entries)))
+
+        # A swapped root or a batch root signed alone must fail
+        entries[3] = dict(entries[3], root=roots[4])
+        self.assertEqual(verify_roots_batch(entries).count(False), 1)
+        self.assertFalse(verify_signature(entries[0]["batch_root"], entries[0]["signature"]))
+
+        # An internal node's hash input must not pass as a signed root with its parent's proof
+        proof = entries[0]["proof"]
+        direction, sibling_hash = proof[0]
+        leaf_hash = HashFunc.custom_hash(BATCH_LEAF_PREFIX + roots[0])
+        node_input = sibling_hash + leaf_hash if direction == "L" else leaf_hash + sibling_hash
+        self.assertFalse(verify_root_proof(node_input, proof[1:], entries[0]["batch_root"]))
+        self.assertFalse(verify_roots_batch([dict(entries[0], root=node_input, proof=proof[1:])])[0])
+        with self.assertRaises(ValueError):
+            sign_roots_batch(["abc def"])
+
+    def test_signature_backends(self):
+        # Test keys generated on first use are saved and picked up by a fresh handler
+        with tempfile.TemporaryDirectory() as directory:
+            for name in BACKENDS:
+                paths = {"private_key_path": os.path.join(directory, f"{name}.key"),
+                         "public_key_path": os.path.join(directory, f"{name}.pub")}
+                signature = DigitalSignature(get_backend(name, **paths)).generate_signature(self.root_hash)
+                handler = DigitalSignature(get_backend(name, **paths))
+                self.assertTrue(handler.verify_signature(self.root_hash, signature))
+                self.assertFalse(handler.verify_signature(self.root_hash + "0", signature))
+                # Without its file the public key is derived from the private key
+                os.remove(paths["public_key_path"])
+                backend = get_backend(name, **paths)
+                self.assertTrue(DigitalSignature(backend).verify_signature(self.root_hash, signature))
+        with self.assertRaises(ValueError):
+            get_backend("dsa")
+        with self.assertRaises(TypeError):
+            SignatureBackend()
+
 class TestMerkleTree(unittest.TestCase):
     def setUp(self):
         self.test_data = "The quick brown fox jumps over the lazy dog"
@@ -109,6 +211,196 @@ class TestMerkleTree(unittest.TestCase):
         modified_encoder = Encoder(modified_data, isFile=False)
         self.assertNotEqual(self.encoder.getFinalHash(), modified_encoder.getFinalHash())
 
+    def test_parallel_workers(self):
+        # Test sharding hashes across worker processes gives the same root
+        words = " ".join(f"word{i % 300}" for i in range(1000))
+        with patch.object(Encoder, "parallelThreshold", 50):
+            parallel_encoder = Encoder(words, isFile=False, workers=2)
+            self.assertIsNone(parallel_encoder.executor)
+            # A large batch after the build does not leave a pool running
+            inputs = [f"input{i}" for i in range(100)]
+            self.assertEqual(parallel_encoder.hashMany(inputs), HashFunc.custom_hash_many(inputs))
+            self.assertIsNone(parallel_encoder.executor)
+        self.assertEqual(parallel_encoder.getFinalHash(), Encoder(words, isFile=False).getFinalHash())
+
+    def test_proof_paths(self):
+        # Test every proof verifies against the root and matches the bulk export
+        root_hash = self.encoder.getFinalHash()
+        all_proofs = dict(self.encoder.getAllProofs())
+        self.assertEqual(set(all_proofs), set(self.encoder.fileDict))
+        for word in self.encoder.fileDict:
+            proof = self.encoder.get_proof_path(self.encoder.getRoot(), word)
+            self.assertEqual(proof, all_proofs[word])
+            self.assertTrue(self.encoder.verify_chunk_with_path(word, proof, root_hash))
+        self.assertFalse(self.encoder.verify_chunk_with_path("cat", all_proofs["dog"], root_hash))
+        self.assertIsNone(self.encoder.get_proof_path(self.encoder.getRoot(), "missing"))
+
+    def test_multiproof(self):
+        # Test a multiproof verifies all its words and rejects a wrong root
+        root_hash = self.encoder.getFinalHash()
+        words = ["quick", "fox", "lazy", "dog"]
+        multiproof = self.encoder.get_multiproof(words)
+        separate_size = sum(len(self.encoder.get_proof_path(self.encoder.getRoot(), word)) for word in words)
+        self.assertLess(len(multiproof["siblings"]), separate_size)
+        self.assertTrue(self.encoder.verify_multiproof(words, multiproof, root_hash))
+        self.assertFalse(self.encoder.verify_multiproof(words, multiproof, self.encoder.hash("other")))
+        self.assertFalse(self.encoder.verify_multiproof(["quick", "fox", "lazy", "cat"], multiproof, root_hash))
+        self.assertIsNone(self.encoder.get_multiproof(["quick", "missing"]))
+
+    def test_multiproof_forgery(self):
+        # Test a multiproof cannot place an extra word above or on top of a real leaf
+        root_hash = self.encoder.getFinalHash()
+        multiproof = self.encoder.get_multiproof(["dog"])
+        position = multiproof["leaves"]["dog"]
+        above = {"leaves": {"FAKEWORD": position[:-1], "dog": position}, "siblings": multiproof["siblings"]}
+        self.assertFalse(self.encoder.verify_multiproof(["FAKEWORD", "dog"], above, root_hash))
+        shared = {"leaves": {"FAKE": position, "dog": position}, "siblings": multiproof["siblings"]}
+        self.assertFalse(self.encoder.verify_multiproof(["FAKE", "dog"], shared, root_hash))
+        self.assertTrue(self.encoder.verify_multiproof(["dog", "dog"], multiproof, root_hash))
+
+    def test_incremental_update(self):
+        # Test updating word counts gives the same root as a full rebuild with fewer hashes
+        full_calls = self.encoder.hashCalls
+        calls = self.encoder.add_word("cat")
+        self.assertEqual(self.encoder.getFinalHash(), Encoder(self.test_data + " cat", isFile=False).getFinalHash())
+        self.assertLess(calls, full_calls)
+        self.encoder.apply_diff({"cat": -1, "fox": 2, "quick": -1})
+        expected = Encoder("The brown fox jumps over the lazy dog fox fox", isFile=False)
+        self.assertEqual(self.encoder.getFinalHash(), expected.getFinalHash())
+        self.assertEqual(self.encoder.get_proof_path(self.encoder.getRoot(), "dog"),
+                         expected.get_proof_path(expected.getRoot(), "dog"))
+        with self.assertRaises(ValueError):
+            self.encoder.remove_word("quick")
+
+    def test_compact_tree(self):
+        # Test the array-backed tree has the same root and proofs as the Node tree
+        compact_encoder = Encoder(self.test_data, isFile=False, compact=True)
+        self.assertIsNone(compact_encoder.nodeList)
+        self.assertEqual(compact_encoder.getFinalHash(), self.encoder.getFinalHash())
+        for word in ["quick", "lazy", "missing"]:
+            self.assertEqual(compact_encoder.get_proof_path(compact_encoder.getRoot(), word),
+                             self.encoder.get_proof_path(self.encoder.getRoot(), word))
+        self.assertEqual(dict(compact_encoder.getAllProofs()), dict(self.encoder.getAllProofs()))
+
+    def test_stats(self):
+        # Test the stage timings and counters describe the build
+        stats = self.encoder.stats
+        self.assertEqual(list(stats.stageTimes), ["readString", "parseFreq", "makeNodes", "makeTree"])
+        self.assertEqual(stats.vocabularySize, len(self.encoder.fileDict))
+        self.assertEqual(stats.hashCalls, 2 * stats.vocabularySize - 1)
+        self.assertEqual(stats.peakNodeCount, 2 * stats.vocabularySize - 1)
+        self.assertGreater(stats.bytesHashed, len(self.test_data))
+        compact_encoder = Encoder(self.test_data, isFile=False, compact=True)
+        self.assertEqual(compact_encoder.stats.treeDepth, stats.treeDepth)
+
+    def test_progress_and_cancel(self):
+        # Test progress reaches every node and an exception from the callback aborts the build
+        text = " ".join(f"word{i}" for i in range(500))
+        reports = []
+        with patch.object(Encoder, "progressChunkSize", 100):
+            encoder = Encoder(text, isFile=False, progress=lambda *report: reports.append(report))
+            self.assertEqual(reports[-1], ("hash", 999, 999))
+            self.assertGreater(len(reports), 5)
+            self.assertEqual(encoder.getFinalHash(), Encoder(text, isFile=False).getFinalHash())
+
+            def cancel(stage, done, total):
+                raise RuntimeError("cancelled")
+            with self.assertRaises(RuntimeError):
+                Encoder(text, isFile=False, progress=cancel)
+
+    def test_chunk_leaves(self):
+        # Test chunked binary input keeps unchanged chunks after an insertion and proves a chunk
+        data = random.Random(5).randbytes(200000)
+        edited = data[:100000] + b"inserted" + data[100000:]
+        chunker = Chunker(minSize=256, avgSize=1024, maxSize=8192)
+        chunks = list(chunker.chunks(data))
+        self.assertEqual(b"".join(chunks), data)
+        self.assertGreater(len(set(chunks) & set(chunker.chunks(edited))), len(chunks) - 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.bin")
+            with open(path, "wb") as file:
+                file.write(data)
+            cache = LeafCache()
+            encoder = Encoder(path, isFile=True, leafMode="chunks", chunker=chunker, leafCache=cache)
+            self.assertEqual(encoder.chunkHashes, HashFunc.custom_hash_many(chunks))
+            proof = encoder.get_proof_path(encoder.getRoot(), chunks[7])
+            self.assertTrue(encoder.verify_chunk_with_path(chunks[7], proof, encoder.getFinalHash()))
+            reports = []
+            Encoder(path, isFile=True, leafMode="chunks", chunker=chunker, progress=lambda *report: reports.append(report))
+            total = 2 * len(chunks) - 1
+            self.assertEqual([report for report in reports if report[0] == "hash"][-1], ("hash", total, total))
+
+            with open(path, "wb") as file:
+                file.write(edited)
+            misses = cache.misses
+            edited_encoder = Encoder(path, isFile=True, leafMode="chunks", chunker=chunker, leafCache=cache)
+            self.assertNotEqual(edited_encoder.getFinalHash(), encoder.getFinalHash())
+            self.assertLessEqual(cache.misses - misses, 3)
+        with self.assertRaises(ValueError):
+            Encoder("text", isFile=False, leafMode="chunks", compact=True)
+
+    def test_raw_digests(self):
+        # Test raw digest trees agree across storage modes, export hex proofs and share the leaf cache
+        text = "the quick brown fox jumps over the lazy dog the fox " + " ".join(f"word{i}" for i in range(200))
+        cache = LeafCache()
+        encoder = Encoder(text, isFile=False, rawDigests=True, leafCache=cache)
+        compact = Encoder(text, isFile=False, rawDigests=True, compact=True)
+        root_hash = encoder.getFinalHash()
+        self.assertNotEqual(root_hash, Encoder(text, isFile=False, leafCache=cache).getFinalHash())
+        self.assertEqual(compact.getFinalHash(), root_hash)
+        self.assertEqual(Encoder.rootHash(text, rawDigests=True), root_hash)
+        self.assertEqual(HashFunc.custom_hash_many_bytes(["fox"])[0], HashFunc.custom_hash_bytes(b"fox"))
+
+        proof = encoder.get_proof_path(encoder.getRoot(), "fox")
+        self.assertEqual(proof, compact.get_proof_path(compact.getRoot(), "fox"))
+        self.assertTrue(all(isinstance(sibling, str) for _, sibling in proof))
+        self.assertTrue(compact.verify_chunk_with_path("fox", proof, root_hash))
+        self.assertFalse(encoder.verify_chunk_with_path("dog", proof, root_hash))
+        multiproof = encoder.get_multiproof(["fox", "word7"])
+        self.assertTrue(compact.verify_multiproof(["fox", "word7"], multiproof, root_hash))
+        # Malformed sibling hex is rejected rather than raising
+        self.assertFalse(encoder.verify_chunk_with_path("fox", [("L", "abc")], root_hash))
+        self.assertFalse(encoder.verify_chunk_with_path("fox", [("R", "zz")], root_hash))
+        forged = {"leaves": multiproof["leaves"], "siblings": dict.fromkeys(multiproof["siblings"], "abc")}
+        self.assertFalse(encoder.verify_multiproof(["fox", "word7"], forged, root_hash))
+
+        tree_path = "test_raw_tree.bin"
+        try:
+            encoder.save(tree_path)
+            loaded = Encoder.load(tree_path, mmap=False)
+            self.assertTrue(loaded.rawDigests)
+            self.assertEqual(loaded.getFinalHash(), root_hash)
+            self.assertEqual(loaded.get_proof_path(loaded.getRoot(), "fox"), proof)
+        finally:
+            os.remove(tree_path)
+
+    def test_save_and_load(self):
+        # Test a saved tree reopens with the same root and proofs
+        tree_path = "test_tree.bin"
+        try:
+            self.encoder.save(tree_path)
+            for use_mmap in (True, False):
+                loaded = Encoder.load(tree_path, mmap=use_mmap)
+                self.assertEqual(loaded.getFinalHash(), self.encoder.getFinalHash())
+                self.assertEqual(loaded.get_proof_path(loaded.getRoot(), "fox"),
+                                 self.encoder.get_proof_path(self.encoder.getRoot(), "fox"))
+                self.assertIsNone(loaded.get_proof_path(loaded.getRoot(), "missing"))
+                del loaded
+
+            # A truncated file is rejected like any other file that is not a saved tree
+            with open(tree_path, "rb") as file:
+                data = file.read()
+            for size in (len(data) - 1, len(data) // 2, 10):
+                with open(tree_path, "wb") as file:
+                    file.write(data[:size])
+                for use_mmap in (True, False):
+                    with self.assertRaises(ValueError):
+                        Encoder.load(tree_path, mmap=use_mmap)
+        finally:
+            if os.path.exists(tree_path):
+                os.remove(tree_path)
+
     def test_file_processing(self):
         # Create a temporary test file
         test_file_path = "test_file.txt"
@@ -124,6 +416,23 @@ class TestMerkleTree(unittest.TestCase):
             if os.path.exists(test_file_path):
                 os.remove(test_file_path)
 
+    def test_streamed_file(self):
+        # Test streaming a file in small chunks counts the same words in the same order
+        test_file_path = "stream_test_file.txt"
+        content = "alpha, beta  gamma!\nalpha beta delta " * 40 + "tail"
+        with open(test_file_path, "w") as f:
+            f.write(content)
+
+        try:
+            file_encoder = Encoder(test_file_path, isFile=True)
+            with patch.object(Encoder, "streamChunkSize", 7):
+                streamed_encoder = Encoder(test_file_path, isFile=True, stream=True)
+            self.assertEqual(list(streamed_encoder.fileDict.items()), list(file_encoder.fileDict.items()))
+            self.assertEqual(streamed_encoder.getFinalHash(), file_encoder.getFinalHash())
+        finally:
+            if os.path.exists(test_file_path):
+                os.remove(test_file_path)
+
     def test_special_characters(self):
         # Test data with special characters
         special_chars = "!@#$%^&*()_+-=[]{}|;:,.<>?"
@@ -162,5 +471,180 @@ class TestMerkleTree(unittest.TestCase):
             if os.path.exists(empty_file_path):
                 os.remove(empty_file_path)
 
+class TestLeafCache(unittest.TestCase):
+    def setUp(self):
+        self.test_data = "the cat and the dog and the bird"
+
+    def test_cached_root_matches(self):
+        # Test cached leaf hashes give the same root and count hits on reuse
+        cache = LeafCache(maxSize=100)
+        expected = Encoder(self.test_data, isFile=False).getFinalHash()
+        self.assertEqual(Encoder(self.test_data, isFile=False, leafCache=cache).getFinalHash(), expected)
+        self.assertEqual((cache.hits, cache.misses), (0, 5))
+        self.assertEqual(Encoder(self.test_data, isFile=False, leafCache=cache).getFinalHash(), expected)
+        self.assertEqual((cache.hits, cache.misses), (5, 5))
+
+    def test_lru_eviction(self):
+        # Test the least recently used word is evicted first
+        cache = LeafCache(maxSize=2)
+        cache.hashMany(["a", "b"])
+        cache.get("a")
+        cache.hashMany(["c"])
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(len(cache), 2)
+
+    def test_save_and_load(self):
+        # Test a saved cache reloads with the same entries
+        cache_path = "test_leaf_cache.json"
+        cache = LeafCache()
+        hashes = cache.hashMany(self.test_data.split(" "))
+        try:
+            cache.save(cache_path)
+            loaded = LeafCache()
+            loaded.load(cache_path)
+            self.assertEqual(loaded.hashMany(self.test_data.split(" ")), hashes)
+            self.assertEqual(loaded.misses, 0)
+        finally:
+            if os.path.exists(cache_path):
+                os.remove(cache_path)
+
+class TestDirectoryHasher(unittest.TestCase):
+    def test_forest_root(self):
+        # Test per-file roots, a forest root independent of worker order and skipping unchanged files
+        with tempfile.TemporaryDirectory() as directory:
+            for i in range(4):
+                os.makedirs(os.path.join(directory, f"part{i % 2}"), exist_ok=True)
+                with open(os.path.join(directory, f"part{i % 2}", f"file{i}.txt"), "w") as file:
+                    file.write(f"file number {i} with some words and words")
+            manifest = os.path.join(directory, "manifest.json")
+            hasher = DirectoryHasher(directory, pattern="part*/*.txt", workers=2, manifest=manifest)
+            forest_root = hasher.run()
+            self.assertEqual(hasher.filesHashed, 4)
+            self.assertEqual(hasher.roots["part1/file3.txt"],
+                             Encoder(os.path.join(directory, "part1", "file3.txt"), isFile=True).getFinalHash())
+            self.assertEqual(DirectoryHasher(directory, pattern="part*/*.txt", workers=1).run(), forest_root)
+
+            with open(os.path.join(directory, "part0", "file2.txt"), "a") as file:
+                file.write(" more")
+            rerun = DirectoryHasher(directory, pattern="part*/*.txt", manifest=manifest)
+            self.assertNotEqual(rerun.run(), forest_root)
+            self.assertEqual((rerun.filesHashed, rerun.filesSkipped), (1, 3))
+
+    def test_failed_files(self):
+        # Test a file that fails to hash stops the forest root unless errors are skipped
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "notes.txt"), "w", encoding="utf-8") as file:
+                file.write("plain text")
+            with open(os.path.join(directory, "image.bin"), "wb") as file:
+                file.write(b"\x89PNG\xff\xfe binary")
+            hasher = DirectoryHasher(directory, workers=1)
+            with self.assertRaises(RuntimeError):
+                hasher.run()
+            self.assertEqual(list(hasher.errors), ["image.bin"])
+            self.assertEqual(hasher.run(skipErrors=True),
+                             DirectoryHasher.forestRoot({"notes.txt": hasher.roots["notes.txt"]}))
+
+class TestCollisionSearch(unittest.TestCase):
+    def test_root_hash_many(self):
+        # Test the root-only path matches building full Encoders
+        sentences = ["", "abc", "The quick brown fox the fox", "a b a c d!"]
+        self.assertEqual(Encoder.rootHashMany(sentences),
+                         [Encoder(sentence, isFile=False).getFinalHash() for sentence in sentences])
+
+    def test_parallel_search_finds_planted_match(self):
+        # Test the search reports a candidate whose root equals the target and stops early
+        rng = random.Random(7)
+        candidates = ["".join(rng.choices(ALPHABET, k=12)) for _ in range(1500)]
+        target = candidates[1234]
+        found, tried, _ = parallel_random_string_search(Encoder.rootHash(target), "x" * 12, 10000,
+                                                        workers=2, seed=7, task_size=2000)
+        self.assertEqual(found, target)
+        self.assertLess(tried, 10000)
+
+    def test_parallel_search_cancels_queued_tasks(self):
+        # Test a match with many more tasks than workers keeps the candidate when queued tasks are cancelled
+        rng = random.Random(7)
+        candidates = ["".join(rng.choices(ALPHABET, k=12)) for _ in range(1500)]
+        target = candidates[1234]
+        found, tried, _ = parallel_random_string_search(Encoder.rootHash(target), "x" * 12, 40000,
+                                                        workers=2, seed=7, task_size=2000)
+        self.assertEqual(found, target)
+        self.assertLess(tried, 40000)
+
+    def test_birthday_pairs(self):
+        # Test the sorted-array pair count matches counting truncated digests directly
+        count, bits = 500, 12
+        report = birthday_collisions(count, bits=(bits,), batch_size=128)[0]
+        counts = {}
+        for index in range(count):
+            key = int(HashFunc.custom_hash(birthday_input("hash", 0, index))[-16:], 16) & ((1 << bits) - 1)
+            counts[key] = counts.get(key, 0) + 1
+        self.assertEqual(report["pairs"], sum(n * (n - 1) // 2 for n in counts.values()))
+
+    def test_file_collisions_report_errors(self):
+        # Test a file that fails to hash makes the collision check fail instead of being skipped
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "file1.txt"), "w", encoding="utf-8") as file:
+                file.write("plain text")
+            with open(os.path.join(directory, "file2.txt"), "wb") as file:
+                file.write(b"not \xff utf-8")
+            with patch("Attack.DirectoryHasher", lambda _, pattern: DirectoryHasher(directory, pattern, workers=1)):
+                with self.assertRaises(RuntimeError):
+                    check_file_collisions()
+
+class TestHashFunc(unittest.TestCase):
+    # Digests produced by the original string-based implementation
+    KNOWN_HASHES = [
+        ("My name is Abubakar", 10, "04040404000407f1fbcfa9fc2c75405703131313131313112819d6a95929f8c"),
+        ("My name is Abubakar", 12, "c4c0c0c0c4c0c4c44a0275a9a1b989c30303031313030cc6c72761562733264"),
+        ("Hello 世界", 10, "01f9fbfbfbf9f8ed075969e5c85a4400fcfdfcfcfdfce4616d3a3a21e3e9"),
+        ("x" * 100, 3, "3f7f3f7f3f7f3f60207421cd0e4c8db131303131313130ac05015654010751"),
+        ("", 10, "c7373337333733367310d19d94c195901fcfcfcfcfdfd000508030650040157"),
+    ]
+
+    def test_known_hashes(self):
+        # Test the integer core reproduces the original digests
+        for data, rounds, expected in self.KNOWN_HASHES:
+            self.assertEqual(HashFunc.custom_hash(data, rounds), expected)
+
+    def test_custom_hash_bytes(self):
+        # Test the bytes API returns the same value as the hex API
+        for data, rounds, expected in self.KNOWN_HASHES:
+            digest = HashFunc.custom_hash_bytes(data.encode("utf-8"), rounds)
+            self.assertEqual(int.from_bytes(digest, "big"), int(expected, 16))
+            self.assertEqual(len(digest), (len(expected) + 1) // 2)
+
+    def test_create_hex_int(self):
+        # Test the integer fold matches the string version
+        for data in ["a", "sixteen bytes!!!", "x" * 33, "Hello 世界"]:
+            self.assertEqual(f"{HashFunc.create_hex_int(data.encode('utf-8')):032x}", HashFunc.create_hex(data))
+
+    def test_incremental_hash(self):
+        # Test feeding the input in pieces matches hashing it at once
+        data = "Hello 世界! " * 50
+        for rounds in (0, 10):
+            hasher = HashFunc.new(rounds)
+            for i in range(0, len(data), 7):
+                hasher.update(data[i:i + 7])
+            self.assertEqual(hasher.hexdigest(), HashFunc.custom_hash(data, rounds))
+            self.assertEqual(hasher.digest(), HashFunc.custom_hash_bytes(data.encode("utf-8"), rounds))
+
+    def test_avalanche_analysis(self):
+        # Test the avalanche and distribution measures stay within their ranges
+        from analysis import avalanche, distribution
+        spread = avalanche(count=20, length=4, rounds=10)
+        self.assertTrue(0 < spread["mean_flip_probability"] <= 1)
+        uniform = distribution(count=500, length=4, rounds=10, batch_size=200)
+        self.assertTrue(0 <= uniform["max_bit_bias"] <= 0.5)
+        self.assertGreater(uniform["chi_square_median"], 0)
+
+    def test_custom_hash_many(self):
+        # Test batched hashing matches hashing one input at a time
+        inputs = [f"word{i}" for i in range(300)] + ["", "x" * 1000, "Hello 世界"]
+        for rounds in (0, 1, 10, 12):
+            self.assertEqual(HashFunc.custom_hash_many(inputs, rounds),
+                             [HashFunc.custom_hash(data, rounds) for data in inputs])
+
 if __name__ == "__main__":
     unittest.main()